@@ -6,6 +6,7 @@ Handles file I/O and microphone input.
 import numpy as np
 import librosa
 import soundfile as sf
+import scipy.signal
 import sounddevice as sd
 from pathlib import Path
 from typing import Tuple, Optional
@@ -15,21 +16,32 @@ class AudioProcessor:
     """Handles audio file loading and microphone recording."""
 
     SUPPORTED_FORMATS = {'.wav', '.mp3', '.flac', '.aiff', '.aif', '.ogg', '.m4a'}
+    # Formats decoded directly by libsndfile (others go through librosa)
+    SOUNDFILE_FORMATS = {'.wav', '.flac', '.aiff', '.aif', '.ogg'}
     DEFAULT_SAMPLE_RATE = 22050
+    DEFAULT_MAX_ANALYSIS_SECONDS = 60.0
 
-    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE):
+    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE,
+                 max_analysis_seconds: Optional[float] = DEFAULT_MAX_ANALYSIS_SECONDS):
         """
         Initialize the audio processor.
 
         Args:
             sample_rate: Target sample rate for audio processing
+            max_analysis_seconds: Only load this many seconds from the middle
+                of longer files (None loads the whole file)
         """
         self.sample_rate = sample_rate
+        self.max_analysis_seconds = max_analysis_seconds
 
     def load_audio(self, file_path: str) -> Tuple[np.ndarray, int]:
         """
         Load an audio file and return the audio data and sample rate.
 
+        Files longer than max_analysis_seconds are trimmed to an excerpt
+        of that length taken from the middle of the file; only the excerpt
+        is decoded.
+
         Args:
             file_path: Path to the audio file
 
@@ -41,39 +53,116 @@ class AudioProcessor:
             ValueError: If the file format is not supported
             RuntimeError: If there's an error loading the file
         """
-        path = Path(file_path)
+        audio_data, sr, _ = self.load_audio_with_duration(file_path)
+        return audio_data, sr
 
-        # Check if file exists
-        if not path.exists():
-            raise FileNotFoundError(f"Audio file not found: {file_path}")
+    def load_audio_with_duration(self, file_path: str) -> Tuple[np.ndarray, int, float]:
+        """
+        Load an audio file like load_audio, also returning the file's length.
+
+        The duration is that of the whole file, not of the (possibly
+        trimmed) excerpt that is returned for analysis.
+
+        Args:
+            file_path: Path to the audio file
+
+        Returns:
+            Tuple of (audio_data, sample_rate, file_duration_seconds)
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the file format is not supported
+            RuntimeError: If there's an error loading the file
+        """
+        path = Path(file_path)
 
-        # Check if format is supported
+        # Check if format is supported (no filesystem access needed)
         if path.suffix.lower() not in self.SUPPORTED_FORMATS:
             raise ValueError(
                 f"Unsupported audio format: {path.suffix}. "
                 f"Supported formats: {', '.join(self.SUPPORTED_FORMATS)}"
             )
 
+        # Check if file exists
+        if not path.exists():
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+
         try:
-            # Load audio file with librosa
-            # Convert to mono and resample to target sample rate
-            audio_data, sr = librosa.load(
-                file_path,
-                sr=self.sample_rate,
-                mono=True
-            )
+            if path.suffix.lower() in self.SOUNDFILE_FORMATS:
+                audio_data, sr, total_duration = self._load_with_soundfile(file_path)
+            else:
+                # Compressed formats need librosa's decoder backends
+                offset, duration, total_duration = 0.0, None, None
+                if self.max_analysis_seconds is not None:
+                    total_duration = librosa.get_duration(path=file_path)
+                    if total_duration > self.max_analysis_seconds:
+                        offset = (total_duration - self.max_analysis_seconds) / 2
+                        duration = self.max_analysis_seconds
+
+                audio_data, sr = librosa.load(
+                    file_path,
+                    sr=self.sample_rate,
+                    mono=True,
+                    offset=offset,
+                    duration=duration,
+                    res_type='polyphase',
+                    dtype=np.float32
+                )
+                if total_duration is None:
+                    total_duration = len(audio_data) / sr
 
             # Validate audio data
             if len(audio_data) == 0:
                 raise RuntimeError("Loaded audio file is empty")
 
-            return audio_data, sr
+            # Detectors' FFTs run fastest on contiguous float32 data
+            return np.ascontiguousarray(audio_data, dtype=np.float32), sr, total_duration
 
         except Exception as e:
             if isinstance(e, (FileNotFoundError, ValueError, RuntimeError)):
                 raise
             raise RuntimeError(f"Error loading audio file: {str(e)}") from e
 
+    def _load_with_soundfile(self, file_path: str) -> Tuple[np.ndarray, int, float]:
+        """
+        Decode a file with libsndfile, downmix to mono and resample.
+
+        Args:
+            file_path: Path to the audio file
+
+        Returns:
+            Tuple of (audio_data, sample_rate, file_duration_seconds)
+        """
+        # The header gives the full length without decoding anything
+        info = sf.info(file_path)
+        total_duration = info.frames / info.samplerate
+
+        # Read only the central excerpt when the file is too long
+        start, frames = 0, -1
+        if self.max_analysis_seconds is not None:
+            max_frames = int(self.max_analysis_seconds * info.samplerate)
+            if info.frames > max_frames:
+                start = (info.frames - max_frames) // 2
+                frames = max_frames
+
+        audio_data, sr = sf.read(
+            file_path,
+            frames=frames,
+            start=start,
+            dtype='float32',
+            always_2d=False
+        )
+
+        # Convert to mono
+        if audio_data.ndim > 1:
+            audio_data = audio_data.mean(axis=1, dtype=np.float32)
+
+        # Resample to target sample rate with a polyphase filter
+        if sr != self.sample_rate:
+            audio_data = scipy.signal.resample_poly(audio_data, self.sample_rate, sr)
+
+        return audio_data, self.sample_rate, total_duration
+
     def record_audio(self, duration: float = 10.0) -> Tuple[np.ndarray, int]:
         """
         Record audio from the microphone.
@@ -112,7 +201,7 @@ class AudioProcessor:
             if len(audio_data) == 0:
                 raise RuntimeError("Recorded audio is empty")
 
-            return audio_data, self.sample_rate
+            return np.ascontiguousarray(audio_data, dtype=np.float32), self.sample_rate
 
         except Exception as e:
             if isinstance(e, (ValueError, RuntimeError)):
@@ -169,11 +258,12 @@ class AudioProcessor:
             return False
 
         # Check minimum duration (at least 1 second)
-        if len(audio_data) < self.sample_rate:
+        if audio_data.shape[0] < self.sample_rate:
             return False
 
-        # Check if audio is all zeros (silence)
-        if np.all(audio_data == 0):
+        # Check if audio is all zeros (silence); any() stops at the first
+        # non-zero sample and needs no temporary array
+        if not audio_data.any():
             return False
 
         return True
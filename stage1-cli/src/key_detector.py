@@ -3,9 +3,151 @@ Musical key detection module using chromagram analysis.
 Implements Krumhansl-Schmuckler key-finding algorithm.
 """
 
+import functools
+
 import numpy as np
 import librosa
-from typing import Tuple
+import scipy.fft
+import scipy.signal
+from numba import njit
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+
+# Pitch class names
+PITCH_CLASSES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+# Scale intervals in semitones from the root
+SCALE_INTERVALS = {
+    # Major scale intervals: W W H W W W H (2 2 1 2 2 2 1)
+    'major': (0, 2, 4, 5, 7, 9, 11),
+    # Natural minor scale intervals: W H W W H W W (2 1 2 2 1 2 2)
+    'minor': (0, 2, 3, 5, 7, 8, 10),
+}
+
+# "<key> <mode>" display strings for all 24 keys, built once
+_KEY_STRINGS = {
+    (key, mode): f"{key} {mode}"
+    for key in PITCH_CLASSES
+    for mode in SCALE_INTERVALS
+}
+
+
+def _related_keys(key_idx: int, mode: str) -> dict:
+    """
+    Compute the relative, parallel and dominant keys of a key.
+
+    Args:
+        key_idx: Index of the root note in PITCH_CLASSES
+        mode: "major" or "minor"
+
+    Returns:
+        Dictionary with related keys
+    """
+    key = PITCH_CLASSES[key_idx]
+
+    if mode == 'major':
+        # Relative minor (3 semitones down), parallel minor (same root),
+        # dominant (7 semitones up)
+        return {
+            'relative': _KEY_STRINGS[(PITCH_CLASSES[(key_idx - 3) % 12], 'minor')],
+            'parallel': _KEY_STRINGS[(key, 'minor')],
+            'dominant': _KEY_STRINGS[(PITCH_CLASSES[(key_idx + 7) % 12], 'major')],
+        }
+
+    # Relative major (3 semitones up), parallel major (same root),
+    # dominant (7 semitones up)
+    return {
+        'relative': _KEY_STRINGS[(PITCH_CLASSES[(key_idx + 3) % 12], 'major')],
+        'parallel': _KEY_STRINGS[(key, 'major')],
+        'dominant': _KEY_STRINGS[(PITCH_CLASSES[(key_idx + 7) % 12], 'minor')],
+    }
+
+
+# Scale notes and related keys for all 24 keys, looked up by (key, mode)
+_SCALE_TABLE = {
+    (key, mode): tuple(PITCH_CLASSES[(key_idx + interval) % 12] for interval in intervals)
+    for key_idx, key in enumerate(PITCH_CLASSES)
+    for mode, intervals in SCALE_INTERVALS.items()
+}
+_RELATIVE_TABLE = {
+    (key, mode): MappingProxyType(_related_keys(key_idx, mode))
+    for key_idx, key in enumerate(PITCH_CLASSES)
+    for mode in SCALE_INTERVALS
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _chroma_filter_bank(sample_rate: int, n_fft: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the STFT window and chroma projection for a sample rate.
+
+    Every octave is weighted equally: librosa's default Gaussian octave
+    weighting favours the upper notes of a chord and pulls triads towards
+    the wrong key.
+
+    Cached so every KeyDetector at the same rate (e.g. one per batch
+    worker or test) reuses a single copy. The arrays are read-only.
+
+    Args:
+        sample_rate: Sample rate of the audio data
+        n_fft: FFT window size
+
+    Returns:
+        Tuple of (window, chroma_filter), float32 with shapes (n_fft,)
+        and (12, n_fft // 2 + 1)
+    """
+    window = scipy.signal.windows.hann(n_fft, sym=False).astype(np.float32)
+    chroma_filter = librosa.filters.chroma(
+        sr=sample_rate,
+        n_fft=n_fft,
+        octwidth=None
+    ).astype(np.float32)
+    window.flags.writeable = False
+    chroma_filter.flags.writeable = False
+    return window, chroma_filter
+
+
+@njit(cache=True, fastmath=True)
+def _key_scores(chroma, profiles):
+    """
+    Correlate the time-averaged chromagram with every key profile.
+
+    Fuses the average over frames, the z-scoring of the resulting pitch
+    class distribution and the 24 profile dot products into one kernel.
+
+    Args:
+        chroma: Chromagram of shape (12, n_frames)
+        profiles: Z-scored key profiles of shape (24, 12)
+
+    Returns:
+        Pearson correlation with each profile, shape (24,)
+    """
+    n_bins, n_frames = chroma.shape
+
+    distribution = np.empty(n_bins)
+    mean = 0.0
+    for k in range(n_bins):
+        total = 0.0
+        for t in range(n_frames):
+            total += chroma[k, t]
+        distribution[k] = total / n_frames
+        mean += distribution[k]
+    mean /= n_bins
+
+    var = 0.0
+    for k in range(n_bins):
+        distribution[k] -= mean
+        var += distribution[k] * distribution[k]
+    scale = 1.0 / ((np.sqrt(var / n_bins) + 1e-10) * n_bins)
+
+    scores = np.empty(profiles.shape[0])
+    for p in range(profiles.shape[0]):
+        acc = 0.0
+        for k in range(n_bins):
+            acc += profiles[p, k] * distribution[k]
+        scores[p] = acc * scale
+    return scores
 
 
 class KeyDetector:
@@ -19,21 +161,68 @@ class KeyDetector:
     MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
 
     # Pitch class names
-    PITCH_CLASSES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+    PITCH_CLASSES = PITCH_CLASSES
+
+    # STFT parameters for the chromagram. Bass notes a semitone apart are
+    # only a few Hz apart, so the window is long (~1.35 Hz bins at 22050 Hz).
+    # Frames overlap by 7/8 so short notes near a frame edge, where the
+    # Hann window is close to zero, are still covered by other frames
+    N_FFT = 16384
+    HOP_LENGTH = N_FFT // 8
+
+    # The pitch-class average converges well within this many seconds,
+    # so longer inputs are analyzed over their central excerpt only
+    MAX_ANALYSIS_SECONDS = 10
 
-    def __init__(self, sample_rate: int = 22050):
+    def __init__(self, sample_rate: int = 22050, fft_workers: int = -1):
         """
         Initialize the key detector.
 
         Args:
             sample_rate: Sample rate of the audio data
+            fft_workers: Threads used by the chromagram FFT (-1 uses all
+                CPU cores)
         """
         self.sample_rate = sample_rate
+        self.fft_workers = fft_workers
+
+        # Analysis window and FFT bin -> pitch class projection are
+        # identical for every call, and shared between instances
+        self._win, self._chroma_filter = _chroma_filter_bank(sample_rate, self.N_FFT)
+
+        # Rows 0-11 are the major profile rotated to each root, rows 12-23
+        # the minor profile, each z-scored for correlation by dot product
+        self._profiles = np.empty((24, 12), dtype=np.float32)
+        self._profiles[:12] = self._rotations(self.MAJOR_PROFILE)
+        self._profiles[12:] = self._rotations(self.MINOR_PROFILE)
+        self._profiles -= self._profiles.mean(axis=1, keepdims=True)
+        self._profiles /= self._profiles.std(axis=1, keepdims=True)
+
+        # Compile (or load from cache) the correlation kernel up front
+        _key_scores(np.ones((12, 2), dtype=np.float32), self._profiles)
+
+    @staticmethod
+    def _rotations(profile: np.ndarray) -> np.ndarray:
+        """
+        All 12 rotations of a key profile as views into a doubled ring.
+
+        Args:
+            profile: Key profile with 12 values
+
+        Returns:
+            Array of shape (12, 12) whose row i equals np.roll(profile, i)
+        """
+        ring = np.concatenate([profile, profile])
+        # Row i is ring[12 - i:24 - i], i.e. windows 12, 11, ..., 1
+        return np.lib.stride_tricks.sliding_window_view(ring, 12)[12:0:-1]
 
     def detect(self, audio_data: np.ndarray) -> Tuple[str, str, float]:
         """
         Detect the musical key of the audio.
 
+        Inputs longer than MAX_ANALYSIS_SECONDS are analyzed over their
+        central MAX_ANALYSIS_SECONDS only.
+
         Args:
             audio_data: Audio data as numpy array
 
@@ -45,6 +234,7 @@ class KeyDetector:
 
         Raises:
             ValueError: If audio data is invalid
+            RuntimeError: If the audio is silent or detection fails
         """
         if audio_data is None or len(audio_data) == 0:
             raise ValueError("Audio data is empty")
@@ -52,90 +242,81 @@ class KeyDetector:
         if len(audio_data) < self.sample_rate:
             raise ValueError("Audio data is too short (minimum 1 second)")
 
+        max_samples = self.MAX_ANALYSIS_SECONDS * self.sample_rate
+        if len(audio_data) > max_samples:
+            start = (len(audio_data) - max_samples) // 2
+            audio_data = audio_data[start:start + max_samples]
+
+        # Single-precision all the way through the FFT; conforming input
+        # (e.g. from AudioProcessor) is used as-is
+        if (not isinstance(audio_data, np.ndarray)
+                or audio_data.dtype != np.float32
+                or not audio_data.flags.c_contiguous):
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+
+        # Silence has no pitch content; reject it before any FFT work
+        if float(np.abs(audio_data).max()) < 1e-6:
+            raise RuntimeError("Error detecting key: audio is silent")
+
         try:
             # Compute chromagram
-            chroma = librosa.feature.chroma_cqt(
-                y=audio_data,
-                sr=self.sample_rate,
-                hop_length=512
-            )
-
-            # Average across time to get pitch class distribution
-            pitch_class_distribution = np.mean(chroma, axis=1)
+            chroma = self._chromagram(audio_data)
 
-            # Normalize the distribution
-            pitch_class_distribution = pitch_class_distribution / np.sum(pitch_class_distribution)
+            # Scale each frame to a peak of 1 so loud passages don't dominate
+            peak = np.max(chroma, axis=0, keepdims=True)
+            peak += 1e-10
+            np.divide(chroma, peak, out=chroma)
 
-            # Find best matching key using Krumhansl-Schmuckler algorithm
-            key, mode, confidence = self._find_best_key(pitch_class_distribution)
+            # Average across time and correlate with every key profile
+            # (Krumhansl-Schmuckler algorithm)
+            scores = _key_scores(chroma, self._profiles)
 
-            return key, mode, confidence
+            return self._best_key(scores)
 
         except Exception as e:
             raise RuntimeError(f"Error detecting key: {str(e)}") from e
 
-    def _find_best_key(self, pitch_distribution: np.ndarray) -> Tuple[str, str, float]:
+    def _chromagram(self, audio_data: np.ndarray) -> np.ndarray:
         """
-        Find the best matching key using correlation with key profiles.
+        Compute a power chromagram from a Hann-windowed STFT.
 
         Args:
-            pitch_distribution: Normalized pitch class distribution
+            audio_data: Audio data as numpy array
 
         Returns:
-            Tuple of (key, mode, confidence)
+            Chromagram of shape (12, n_frames)
         """
-        max_correlation = -1
-        best_key = 'C'
-        best_mode = 'major'
-
-        # Try all 12 keys in both major and minor
-        for i in range(12):
-            # Rotate the profiles to match each key
-            major_profile = np.roll(self.MAJOR_PROFILE, i)
-            minor_profile = np.roll(self.MINOR_PROFILE, i)
+        # Low sample rates can leave the one-second minimum shorter than
+        # a single frame
+        if len(audio_data) < self.N_FFT:
+            audio_data = np.pad(audio_data, (0, self.N_FFT - len(audio_data)))
 
-            # Calculate correlation with major profile
-            major_corr = self._correlation(pitch_distribution, major_profile)
+        frames = np.lib.stride_tricks.sliding_window_view(
+            audio_data, self.N_FFT
+        )[::self.HOP_LENGTH] * self._win
+        power = np.abs(scipy.fft.rfft(frames, axis=1, workers=self.fft_workers))
+        power *= power
 
-            # Calculate correlation with minor profile
-            minor_corr = self._correlation(pitch_distribution, minor_profile)
+        return self._chroma_filter @ power.T
 
-            # Check if major key is the best so far
-            if major_corr > max_correlation:
-                max_correlation = major_corr
-                best_key = self.PITCH_CLASSES[i]
-                best_mode = 'major'
-
-            # Check if minor key is the best so far
-            if minor_corr > max_correlation:
-                max_correlation = minor_corr
-                best_key = self.PITCH_CLASSES[i]
-                best_mode = 'minor'
-
-        # Normalize correlation to 0-1 confidence range
-        confidence = (max_correlation + 1) / 2  # Correlation ranges from -1 to 1
-
-        return best_key, best_mode, confidence
-
-    def _correlation(self, x: np.ndarray, y: np.ndarray) -> float:
+    def _best_key(self, scores: np.ndarray) -> Tuple[str, str, float]:
         """
-        Calculate Pearson correlation coefficient.
+        Pick the key whose profile correlates best.
 
         Args:
-            x: First array
-            y: Second array
+            scores: Correlation with each row of the profile matrix
 
         Returns:
-            Correlation coefficient
+            Tuple of (key, mode, confidence)
         """
-        # Normalize arrays
-        x_normalized = (x - np.mean(x)) / (np.std(x) + 1e-10)
-        y_normalized = (y - np.mean(y)) / (np.std(y) + 1e-10)
+        idx = int(np.argmax(scores))
+        best_key = self.PITCH_CLASSES[idx % 12]
+        best_mode = 'major' if idx < 12 else 'minor'
 
-        # Calculate correlation
-        correlation = np.mean(x_normalized * y_normalized)
+        # Normalize correlation to 0-1 confidence range
+        confidence = (float(scores[idx]) + 1) / 2  # Correlation ranges from -1 to 1
 
-        return correlation
+        return best_key, best_mode, confidence
 
     def get_key_string(self, key: str, mode: str) -> str:
         """
@@ -148,7 +329,10 @@ class KeyDetector:
         Returns:
             Formatted key string (e.g., "C major", "A minor")
         """
-        return f"{key} {mode}"
+        key_string = _KEY_STRINGS.get((key, mode))
+        if key_string is None:
+            key_string = f"{key} {mode}"
+        return key_string
 
     def get_confidence_level(self, confidence: float) -> str:
         """
@@ -167,7 +351,7 @@ class KeyDetector:
         else:
             return "Low"
 
-    def get_relative_keys(self, key: str, mode: str) -> dict:
+    def get_relative_keys(self, key: str, mode: str) -> Mapping[str, str]:
         """
         Get related keys (relative, parallel, dominant).
 
@@ -176,39 +360,11 @@ class KeyDetector:
             mode: "major" or "minor"
 
         Returns:
-            Dictionary with related keys
+            Read-only mapping with related keys
         """
-        key_idx = self.PITCH_CLASSES.index(key)
-
-        result = {}
+        return _RELATIVE_TABLE[(key, mode)]
 
-        if mode == 'major':
-            # Relative minor (6 semitones down)
-            relative_idx = (key_idx - 3) % 12
-            result['relative'] = f"{self.PITCH_CLASSES[relative_idx]} minor"
-
-            # Parallel minor (same root)
-            result['parallel'] = f"{key} minor"
-
-            # Dominant (5 semitones up)
-            dominant_idx = (key_idx + 7) % 12
-            result['dominant'] = f"{self.PITCH_CLASSES[dominant_idx]} major"
-
-        else:  # minor
-            # Relative major (3 semitones up)
-            relative_idx = (key_idx + 3) % 12
-            result['relative'] = f"{self.PITCH_CLASSES[relative_idx]} major"
-
-            # Parallel major (same root)
-            result['parallel'] = f"{key} major"
-
-            # Dominant (7 semitones up)
-            dominant_idx = (key_idx + 7) % 12
-            result['dominant'] = f"{self.PITCH_CLASSES[dominant_idx]} minor"
-
-        return result
-
-    def get_scale_notes(self, key: str, mode: str) -> list:
+    def get_scale_notes(self, key: str, mode: str) -> Tuple[str, ...]:
         """
         Get the notes in the scale for the given key.
 
@@ -217,17 +373,6 @@ class KeyDetector:
             mode: "major" or "minor"
 
         Returns:
-            List of notes in the scale
+            Tuple of notes in the scale
         """
-        key_idx = self.PITCH_CLASSES.index(key)
-
-        if mode == 'major':
-            # Major scale intervals: W W H W W W H (2 2 1 2 2 2 1)
-            intervals = [0, 2, 4, 5, 7, 9, 11]
-        else:  # natural minor
-            # Natural minor scale intervals: W H W W H W W (2 1 2 2 1 2 2)
-            intervals = [0, 2, 3, 5, 7, 8, 10]
-
-        scale = [self.PITCH_CLASSES[(key_idx + interval) % 12] for interval in intervals]
-
-        return scale
+        return _SCALE_TABLE[(key, mode)]
@@ -0,0 +1,29 @@
+"""
+Audio helpers shared by the test modules.
+"""
+
+import functools
+import wave
+
+import numpy as np
+
+
+@functools.lru_cache(maxsize=8)
+def sine_wave(sr: int, duration: float, freq: float) -> np.ndarray:
+    """Build a 0.5 amplitude sine wave once per (sr, duration, freq)."""
+    t = np.arange(int(sr * duration), dtype=np.float32)
+    audio = np.sin((2 * np.pi * freq / sr) * t, dtype=np.float32)
+    audio *= 0.5
+    # Shared between tests, so guard against accidental mutation
+    audio.flags.writeable = False
+    return audio
+
+
+def write_wav(path: str, audio: np.ndarray, sr: int) -> None:
+    """Write mono float audio as a 16-bit PCM WAV using the stdlib."""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframesraw(pcm)
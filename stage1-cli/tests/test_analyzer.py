@@ -2,6 +2,7 @@
 Integration tests for the analyzer module.
 """
 
+import contextlib
 import pytest
 import numpy as np
 import tempfile
@@ -13,6 +14,56 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from analyzer import AudioAnalyzer
 
+from .helpers import sine_wave, write_wav
+
+
+@pytest.fixture(scope="session")
+def sample_audio_file(tmp_path_factory):
+    """Write a 3 second test WAV once for the whole session."""
+    sample_rate = 22050
+    path = tmp_path_factory.mktemp("audio") / "sine_440.wav"
+    write_wav(str(path), sine_wave(sample_rate, 3.0, 440.0), sample_rate)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def cached_results(sample_audio_file):
+    """Analyze the session WAV once and share the results."""
+    return AudioAnalyzer(verbose=False).analyze_file(sample_audio_file)
+
+
+@pytest.fixture(scope="session")
+def cached_results_verbose(sample_audio_file):
+    """Analyze the session WAV once in verbose mode and share the results."""
+    return AudioAnalyzer(verbose=True).analyze_file(sample_audio_file)
+
+
+# Complete results dict, including the verbose-only keys, for CLI tests
+# that only care about argument handling and exit codes
+_FAKE_RESULTS = {
+    'file': 'test.wav',
+    'bpm': 120.0,
+    'bpm_confidence': 0.85,
+    'bpm_confidence_level': 'High',
+    'key': 'C',
+    'mode': 'major',
+    'key_string': 'C major',
+    'key_confidence': 0.72,
+    'key_confidence_level': 'High',
+    'analysis_time': 0.1,
+    'duration': 3.0,
+    'scale_notes': ['C', 'D', 'E', 'F', 'G', 'A', 'B'],
+    'relative_keys': {'relative': 'A minor', 'parallel': 'C minor', 'dominant': 'G major'}
+}
+
+
+@contextlib.contextmanager
+def _mocked_detection(analyzer):
+    """Replace BPM and key detection with fixed results."""
+    with patch.object(analyzer.bpm_detector, 'detect', return_value=(120.0, 0.85)), \
+         patch.object(analyzer.key_detector, 'detect', return_value=('C', 'major', 0.72)):
+        yield analyzer
+
 
 class TestAudioAnalyzer:
     """Test suite for AudioAnalyzer class."""
@@ -28,27 +79,16 @@ class TestAudioAnalyzer:
         return AudioAnalyzer(verbose=True)
 
     @pytest.fixture
-    def sample_audio_file(self):
-        """Create a temporary audio file for testing."""
-        import soundfile as sf
+    def mock_analyzer(self, analyzer):
+        """AudioAnalyzer that skips the BPM and key detection pipeline."""
+        with _mocked_detection(analyzer):
+            yield analyzer
 
-        sample_rate = 22050
-        duration = 3.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-
-        # Create audio with clear beat pattern
-        audio = 0.5 * np.sin(2 * np.pi * 440 * t)
-
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-            temp_path = f.name
-
-        sf.write(temp_path, audio, sample_rate)
-
-        yield temp_path
-
-        # Cleanup
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    @pytest.fixture
+    def mock_verbose_analyzer(self, verbose_analyzer):
+        """Verbose AudioAnalyzer that skips the BPM and key detection pipeline."""
+        with _mocked_detection(verbose_analyzer):
+            yield verbose_analyzer
 
     def test_init_default(self):
         """Test initialization with default parameters."""
@@ -65,9 +105,9 @@ class TestAudioAnalyzer:
 
         assert analyzer.verbose is True
 
-    def test_analyze_file_success(self, analyzer, sample_audio_file):
+    def test_analyze_file_success(self, mock_analyzer, sample_audio_file):
         """Test successful file analysis."""
-        results = analyzer.analyze_file(sample_audio_file)
+        results = mock_analyzer.analyze_file(sample_audio_file)
 
         # Check that all expected keys are present
         assert 'file' in results
@@ -96,9 +136,13 @@ class TestAudioAnalyzer:
         assert 0.0 <= results['key_confidence'] <= 1.0
         assert results['analysis_time'] > 0
 
-    def test_analyze_file_verbose(self, verbose_analyzer, sample_audio_file):
+        # Detection results are passed through
+        assert results['bpm'] == 120.0
+        assert results['key_string'] == 'C major'
+
+    def test_analyze_file_verbose(self, mock_verbose_analyzer, sample_audio_file):
         """Test file analysis with verbose mode."""
-        results = verbose_analyzer.analyze_file(sample_audio_file)
+        results = mock_verbose_analyzer.analyze_file(sample_audio_file)
 
         # Verbose mode should include additional information
         assert 'scale_notes' in results
@@ -112,6 +156,56 @@ class TestAudioAnalyzer:
         assert 'parallel' in results['relative_keys']
         assert 'dominant' in results['relative_keys']
 
+    def test_analyze_file_reports_full_duration(self, sample_audio_file):
+        """Test that duration is the whole file's length, not the analyzed excerpt."""
+        analyzer = AudioAnalyzer(max_analysis_seconds=2.0)
+
+        results = analyzer.analyze_file(sample_audio_file)
+
+        # Session WAV is 3 seconds long
+        assert results['duration'] == pytest.approx(3.0)
+
+    def test_analyze_file_matches_bpm_detector(self, analyzer, sample_audio_file):
+        """Test that the analyzer reports the same BPM as the detector on its own."""
+        audio_data, _ = analyzer.audio_processor.load_audio(sample_audio_file)
+        bpm, confidence = analyzer.bpm_detector.detect(audio_data)
+
+        results = analyzer.analyze_file(sample_audio_file)
+
+        assert results['bpm'] == bpm
+        assert results['bpm_confidence'] == confidence
+
+    def test_analyze_file_reuses_bpm_filter_bank(self, analyzer, sample_audio_file):
+        """Test that analysis uses the BPM detector's cached mel basis and window."""
+        import librosa
+
+        with patch('librosa.filters.mel', side_effect=AssertionError("mel basis rebuilt")), \
+             patch('librosa.stft', wraps=librosa.stft) as mock_stft:
+            results = analyzer.analyze_file(sample_audio_file)
+
+        assert results['bpm'] > 0
+        mock_stft.assert_called_once()
+        assert mock_stft.call_args.kwargs['window'] is analyzer.bpm_detector._window
+
+    def test_analyze_file_cached(self, sample_audio_file):
+        """Test that repeated analysis of the same content uses the cache."""
+        analyzer = AudioAnalyzer(use_cache=True)
+
+        first = analyzer.analyze_file(sample_audio_file)
+        with patch.object(analyzer.bpm_detector, 'detect') as mock_detect:
+            second = analyzer.analyze_file(sample_audio_file)
+
+        mock_detect.assert_not_called()
+        assert second['bpm'] == first['bpm']
+        assert second['key_string'] == first['key_string']
+        assert second['analysis_time'] == 0.0
+
+    def test_analyze_file_cache_disabled(self, analyzer, sample_audio_file):
+        """Test that the cache is not used unless enabled."""
+        analyzer.analyze_file(sample_audio_file)
+
+        assert len(analyzer._cache) == 0
+
     def test_analyze_file_not_found(self, analyzer):
         """Test analysis of non-existent file."""
         with pytest.raises(FileNotFoundError):
@@ -131,8 +225,6 @@ class TestAudioAnalyzer:
 
     def test_analyze_file_too_short(self, analyzer):
         """Test analysis of too short audio file."""
-        import soundfile as sf
-
         # Create 0.5 second audio (too short)
         sample_rate = 22050
         audio = np.random.randn(sample_rate // 2).astype(np.float32)
@@ -141,7 +233,7 @@ class TestAudioAnalyzer:
             temp_path = f.name
 
         try:
-            sf.write(temp_path, audio, sample_rate)
+            write_wav(temp_path, audio, sample_rate)
 
             with pytest.raises(ValueError, match="too short"):
                 analyzer.analyze_file(temp_path)
@@ -150,17 +242,15 @@ class TestAudioAnalyzer:
                 os.remove(temp_path)
 
     @patch('analyzer.AudioProcessor.record_audio')
-    def test_analyze_microphone_success(self, mock_record, analyzer):
+    def test_analyze_microphone_success(self, mock_record, mock_analyzer):
         """Test successful microphone analysis."""
         # Mock the recording to return sample audio
         sample_rate = 22050
-        duration = 3.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        mock_audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+        mock_audio = sine_wave(sample_rate, 3.0, 440.0)
 
         mock_record.return_value = (mock_audio, sample_rate)
 
-        results = analyzer.analyze_microphone(duration=3.0)
+        results = mock_analyzer.analyze_microphone(duration=3.0)
 
         # Check that all expected keys are present
         assert 'source' in results
@@ -179,50 +269,39 @@ class TestAudioAnalyzer:
         mock_record.assert_called_once_with(3.0)
 
     @patch('analyzer.AudioProcessor.record_audio')
-    def test_analyze_microphone_verbose(self, mock_record, verbose_analyzer):
+    def test_analyze_microphone_verbose(self, mock_record, mock_verbose_analyzer):
         """Test microphone analysis with verbose mode."""
         # Mock the recording
         sample_rate = 22050
-        duration = 3.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        mock_audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+        mock_audio = sine_wave(sample_rate, 3.0, 440.0)
 
         mock_record.return_value = (mock_audio, sample_rate)
 
-        results = verbose_analyzer.analyze_microphone(duration=3.0)
+        results = mock_verbose_analyzer.analyze_microphone(duration=3.0)
 
         # Verbose mode should include additional information
         assert 'scale_notes' in results
         assert 'relative_keys' in results
 
-    def test_analyze_microphone_invalid_duration(self, analyzer):
+    @pytest.mark.parametrize("bad_duration", [0, -5, 400])
+    def test_analyze_microphone_invalid_duration(self, analyzer, bad_duration):
         """Test microphone analysis with invalid duration."""
         with pytest.raises(ValueError):
-            analyzer.analyze_microphone(duration=0)
-
-        with pytest.raises(ValueError):
-            analyzer.analyze_microphone(duration=-5)
+            analyzer.analyze_microphone(duration=bad_duration)
 
-        with pytest.raises(ValueError):
-            analyzer.analyze_microphone(duration=400)
-
-    def test_display_results_normal(self, analyzer, sample_audio_file):
+    def test_display_results_normal(self, analyzer, cached_results):
         """Test displaying results in normal mode."""
-        results = analyzer.analyze_file(sample_audio_file)
-
         # Should not raise any errors
         try:
-            analyzer.display_results(results)
+            analyzer.display_results(cached_results)
         except Exception as e:
             pytest.fail(f"display_results raised unexpected exception: {e}")
 
-    def test_display_results_verbose(self, verbose_analyzer, sample_audio_file):
+    def test_display_results_verbose(self, verbose_analyzer, cached_results_verbose):
         """Test displaying results in verbose mode."""
-        results = verbose_analyzer.analyze_file(sample_audio_file)
-
         # Should not raise any errors
         try:
-            verbose_analyzer.display_results(results)
+            verbose_analyzer.display_results(cached_results_verbose)
         except Exception as e:
             pytest.fail(f"display_results raised unexpected exception: {e}")
 
@@ -253,26 +332,6 @@ class TestAudioAnalyzer:
 class TestAudioAnalyzerCLI:
     """Test the CLI functionality."""
 
-    @pytest.fixture
-    def sample_audio_file(self):
-        """Create a temporary audio file for testing."""
-        import soundfile as sf
-
-        sample_rate = 22050
-        duration = 3.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        audio = 0.5 * np.sin(2 * np.pi * 440 * t)
-
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-            temp_path = f.name
-
-        sf.write(temp_path, audio, sample_rate)
-
-        yield temp_path
-
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-
     def test_main_with_file(self, sample_audio_file):
         """Test main function with file argument."""
         from analyzer import main
@@ -289,7 +348,9 @@ class TestAudioAnalyzerCLI:
             exit_code = main()
             assert exit_code == 1
 
-    def test_main_with_verbose(self, sample_audio_file):
+    @patch('analyzer.AudioAnalyzer.display_results')
+    @patch('analyzer.AudioAnalyzer.analyze_file', return_value=_FAKE_RESULTS)
+    def test_main_with_verbose(self, mock_analyze, mock_display, sample_audio_file):
         """Test main function with verbose flag."""
         from analyzer import main
 
@@ -297,40 +358,46 @@ class TestAudioAnalyzerCLI:
             exit_code = main()
             assert exit_code == 0
 
-    @patch('analyzer.AudioProcessor.record_audio')
-    def test_main_with_mic(self, mock_record):
+        mock_analyze.assert_called_once_with(sample_audio_file)
+        mock_display.assert_called_once_with(_FAKE_RESULTS)
+
+    @patch('analyzer.AudioAnalyzer.display_results')
+    @patch('analyzer.AudioAnalyzer.analyze_microphone', return_value=_FAKE_RESULTS)
+    def test_main_with_mic(self, mock_analyze, mock_display):
         """Test main function with microphone input."""
         from analyzer import main
 
-        # Mock the recording
-        sample_rate = 22050
-        duration = 3.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        mock_audio = 0.5 * np.sin(2 * np.pi * 440 * t)
-
-        mock_record.return_value = (mock_audio, sample_rate)
-
         with patch('sys.argv', ['analyzer.py', '--mic']):
             exit_code = main()
             assert exit_code == 0
 
-    @patch('analyzer.AudioProcessor.record_audio')
-    def test_main_with_mic_custom_duration(self, mock_record):
+        mock_analyze.assert_called_once_with(10.0)
+
+    @patch('analyzer.AudioAnalyzer.display_results')
+    @patch('analyzer.AudioAnalyzer.analyze_microphone', return_value=_FAKE_RESULTS)
+    def test_main_with_mic_custom_duration(self, mock_analyze, mock_display):
         """Test main function with custom recording duration."""
         from analyzer import main
 
-        # Mock the recording
-        sample_rate = 22050
-        duration = 15.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        mock_audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+        with patch('sys.argv', ['analyzer.py', '--mic', '--duration', '15']):
+            exit_code = main()
+            assert exit_code == 0
 
-        mock_record.return_value = (mock_audio, sample_rate)
+        mock_analyze.assert_called_once_with(15.0)
 
-        with patch('sys.argv', ['analyzer.py', '--mic', '--duration', '15']):
+    @patch('analyzer.AudioAnalyzer.analyze_file', return_value=_FAKE_RESULTS)
+    def test_main_with_json_output(self, mock_analyze, sample_audio_file, capsys):
+        """Test main function prints results as JSON."""
+        import json
+        from analyzer import main
+
+        with patch('sys.argv', ['analyzer.py', '--file', sample_audio_file, '--json']):
             exit_code = main()
             assert exit_code == 0
 
+        printed = json.loads(capsys.readouterr().out)
+        assert printed == _FAKE_RESULTS
+
     def test_main_keyboard_interrupt(self, sample_audio_file):
         """Test main function handles keyboard interrupt."""
         from analyzer import main
@@ -346,25 +413,26 @@ class TestAudioAnalyzerIntegration:
 
     def test_complete_file_analysis_pipeline(self):
         """Test the complete pipeline from file loading to results."""
-        import soundfile as sf
-
         # Create a test audio file with known properties
         sample_rate = 22050
         duration = 5.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-
-        # Create audio with C major chord
-        audio = (
-            0.33 * np.sin(2 * np.pi * 261.63 * t) +  # C4
-            0.33 * np.sin(2 * np.pi * 329.63 * t) +  # E4
-            0.33 * np.sin(2 * np.pi * 392.00 * t)    # G4
-        )
+        n = int(sample_rate * duration)
+        t = np.arange(n, dtype=np.float32)
+
+        # Create audio with C major chord, summed in place
+        audio = np.zeros(n, dtype=np.float32)
+        tone = np.empty_like(audio)
+        for freq in (261.63, 329.63, 392.00):  # C4, E4, G4
+            np.multiply(t, 2 * np.pi * freq / sample_rate, out=tone)
+            np.sin(tone, out=tone)
+            audio += tone
+        audio *= 0.33
 
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
             temp_path = f.name
 
         try:
-            sf.write(temp_path, audio, sample_rate)
+            write_wav(temp_path, audio, sample_rate)
 
             analyzer = AudioAnalyzer(verbose=True)
             results = analyzer.analyze_file(temp_path)
@@ -397,9 +465,10 @@ class TestAudioAnalyzerIntegration:
         with pytest.raises(ValueError):
             analyzer.analyze_microphone(duration=-1)
 
-    def test_multiple_analyses(self):
-        """Test performing multiple analyses in sequence."""
-        import soundfile as sf
+    def test_multiple_analyses(self, tmp_path):
+        """Test analyzing multiple files across worker processes."""
+        from rich.console import Console
+        from analyzer import analyze_batch
 
         analyzer = AudioAnalyzer()
 
@@ -407,31 +476,19 @@ class TestAudioAnalyzerIntegration:
         files = []
         for i in range(3):
             sample_rate = 22050
-            duration = 2.0
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            audio = 0.5 * np.sin(2 * np.pi * (440 + i * 50) * t)
+            audio = sine_wave(sample_rate, 2.0, 440.0 + i * 50)
 
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-                temp_path = f.name
-                files.append(temp_path)
+            temp_path = str(tmp_path / f"tone_{i}.wav")
+            write_wav(temp_path, audio, sample_rate)
+            files.append(temp_path)
 
-            sf.write(temp_path, audio, sample_rate)
+        # Analyze all files in parallel
+        all_results = analyze_batch(analyzer, files, False, Console(quiet=True), workers=3)
 
-        try:
-            # Analyze all files
-            all_results = []
-            for file_path in files:
-                results = analyzer.analyze_file(file_path)
-                all_results.append(results)
-
-            # Verify all analyses completed
-            assert len(all_results) == 3
-
-            for results in all_results:
-                assert results['bpm'] > 0
-                assert results['key'] in ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+        # Verify all analyses completed, in input order
+        assert len(all_results) == 3
+        assert [results['file'] for results in all_results] == files
 
-        finally:
-            for file_path in files:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+        for results in all_results:
+            assert results['bpm'] > 0
+            assert results['key'] in ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
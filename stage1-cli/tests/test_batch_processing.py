@@ -3,58 +3,59 @@ Unit tests for batch processing functionality.
 """
 
 import pytest
-import tempfile
+import io
 import os
 import json
 import csv
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from analyzer import analyze_batch, save_results, display_batch_summary, AudioAnalyzer
+from analyzer import analyze_batch, save_results, display_batch_summary, AudioAnalyzer, CSV_FIELDNAMES
 from rich.console import Console
 
 
-class TestBatchProcessing:
-    """Test suite for batch processing functions."""
+def _write_audio_files(paths, audios, sample_rate):
+    """Write audio files concurrently (libsndfile releases the GIL during I/O)."""
+    import soundfile as sf
 
-    @pytest.fixture
-    def analyzer(self):
-        """Create an AudioAnalyzer instance."""
-        return AudioAnalyzer(verbose=False)
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        list(executor.map(lambda path, audio: sf.write(path, audio, sample_rate), paths, audios))
 
-    @pytest.fixture
-    def console(self):
-        """Create a Rich console instance."""
-        return Console()
 
-    @pytest.fixture
-    def sample_audio_files(self):
-        """Create multiple temporary audio files for testing."""
-        import soundfile as sf
-        import numpy as np
+@pytest.fixture(scope="module")
+def analyzer():
+    """Create one AudioAnalyzer shared by all tests in the module."""
+    return AudioAnalyzer(verbose=False)
 
-        files = []
-        sample_rate = 22050
 
-        for i in range(3):
-            duration = 2.0
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            audio = 0.5 * np.sin(2 * np.pi * (440 + i * 50) * t)
+@pytest.fixture(scope="module")
+def console():
+    """Create one silent Rich console shared by all tests in the module."""
+    return Console(file=io.StringIO(), quiet=True)
 
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-                temp_path = f.name
-                files.append(temp_path)
 
-            sf.write(temp_path, audio, sample_rate)
+class TestBatchProcessing:
+    """Test suite for batch processing functions."""
+
+    @pytest.fixture(scope="module")
+    def sample_audio_files(self, tmp_path_factory):
+        """Create multiple audio files once for all tests in the module."""
+        import numpy as np
 
-        yield files
+        sample_rate = 22050
+        audio_dir = tmp_path_factory.mktemp("batch")
 
-        # Cleanup
-        for file_path in files:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        duration = 2.0
+        t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
+        audios = [0.5 * np.sin(2 * np.pi * (440 + i * 50) * t) for i in range(3)]
+        files = [str(audio_dir / f"tone_{i}.wav") for i in range(3)]
+
+        _write_audio_files(files, audios, sample_rate)
+
+        return files
 
     def test_analyze_batch_success(self, analyzer, sample_audio_files, console):
         """Test successful batch analysis of multiple files."""
@@ -88,13 +89,120 @@ class TestBatchProcessing:
         # Should have results for 3 valid files
         assert len(results) == 3
 
+    def test_analyze_batch_parallel(self, analyzer, sample_audio_files, console):
+        """Test batch analysis across worker processes."""
+        results = analyze_batch(analyzer, sample_audio_files, continue_on_error=False,
+                                console=console, workers=3)
+
+        # Results come back in input order regardless of completion order
+        assert [result['file'] for result in results] == sample_audio_files
+        for result in results:
+            assert result['bpm'] > 0
+
+    def test_analyze_batch_parallel_with_invalid_file(self, analyzer, sample_audio_files, console):
+        """Test that a failing file stops a parallel batch without continue_on_error."""
+        file_list = sample_audio_files + ['/nonexistent/file.wav']
+
+        with pytest.raises(FileNotFoundError):
+            analyze_batch(analyzer, file_list, continue_on_error=False,
+                          console=console, workers=2)
+
+    def test_analyze_batch_parallel_continue_on_error(self, analyzer, sample_audio_files, console):
+        """Test that a parallel batch skips failing files with continue_on_error."""
+        file_list = ['/nonexistent/file.wav'] + sample_audio_files
+
+        results = analyze_batch(analyzer, file_list, continue_on_error=True,
+                                console=console, workers=2)
+
+        assert [result['file'] for result in results] == sample_audio_files
+
+    def test_analyze_batch_parallel_reports_failures(self, analyzer, sample_audio_files):
+        """Test that a failed file gets a failure progress line, not a success line."""
+        output = io.StringIO()
+        file_list = sample_audio_files + ['/nonexistent/missing.wav']
+
+        analyze_batch(analyzer, file_list, continue_on_error=True,
+                      console=Console(file=output, width=200), workers=2)
+
+        text = output.getvalue()
+        assert "Failed: missing.wav" in text
+        assert "Analyzed: missing.wav" not in text
+        for file_path in sample_audio_files:
+            assert f"Analyzed: {Path(file_path).name}" in text
+
+    def test_analyze_batch_parallel_deduplicates(self, sample_audio_files, console, tmp_path):
+        """Test that a parallel batch analyzes duplicate content only once."""
+        import shutil
+
+        copy_path = str(tmp_path / "copy.wav")
+        shutil.copyfile(sample_audio_files[0], copy_path)
+        file_list = [sample_audio_files[0], sample_audio_files[1], copy_path]
+
+        results = analyze_batch(AudioAnalyzer(verbose=False, use_cache=True), file_list,
+                                continue_on_error=False, console=console, workers=2)
+
+        assert [result['file'] for result in results] == file_list
+        # The copy is served from the original's results, not re-analyzed
+        assert results[0]['analysis_time'] > 0
+        assert results[2]['analysis_time'] == 0.0
+        assert results[2]['bpm'] == results[0]['bpm']
+        assert results[2]['key_string'] == results[0]['key_string']
+
+    def test_analyze_batch_parallel_uses_parent_cache(self, sample_audio_files, console):
+        """Test that files analyzed in an earlier parallel batch hit the cache."""
+        batch_analyzer = AudioAnalyzer(verbose=False, use_cache=True)
+        first = analyze_batch(batch_analyzer, sample_audio_files[:2], continue_on_error=False,
+                              console=console, workers=2)
+
+        results = analyze_batch(batch_analyzer, sample_audio_files, continue_on_error=False,
+                                console=console, workers=2)
+
+        assert [result['file'] for result in results] == sample_audio_files
+        assert [result['analysis_time'] for result in results[:2]] == [0.0, 0.0]
+        assert [result['bpm'] for result in results[:2]] == [result['bpm'] for result in first]
+        assert results[2]['analysis_time'] > 0
+
+    def test_analyze_batch_parallel_duplicate_of_failed_file(self, console, tmp_path):
+        """Test that duplicates of a failing file are reported as failed too."""
+        bad_file = tmp_path / "bad.wav"
+        bad_file.write_bytes(b"not audio")
+        copy_path = tmp_path / "bad_copy.wav"
+        copy_path.write_bytes(b"not audio")
+
+        results = analyze_batch(AudioAnalyzer(verbose=False, use_cache=True),
+                                [str(bad_file), str(copy_path)], continue_on_error=True,
+                                console=console, workers=2)
+
+        assert results == []
+
+    def test_init_worker_uses_single_threaded_ffts(self, monkeypatch):
+        """Test that batch workers don't run multi-threaded FFTs."""
+        import warnings
+        import librosa
+        import analyzer as analyzer_module
+
+        monkeypatch.setattr(analyzer_module, 'FFT_BACKEND', analyzer_module.FFT_BACKEND)
+        monkeypatch.setattr(analyzer_module, '_worker_analyzer', None)
+        fft_lib = librosa.get_fftlib()
+
+        try:
+            analyzer_module._init_worker(False, 60.0, False)
+
+            assert analyzer_module._worker_analyzer.key_detector.fft_workers == 1
+            if analyzer_module.FFT_BACKEND == 'scipy':
+                assert librosa.get_fftlib().workers == 1
+        finally:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', FutureWarning)
+                librosa.set_fftlib(fft_lib)
+
     def test_analyze_batch_empty_list(self, analyzer, console):
         """Test batch analysis with empty file list."""
         results = analyze_batch(analyzer, [], continue_on_error=False, console=console)
 
         assert len(results) == 0
 
-    def test_save_results_json(self, sample_audio_files, console):
+    def test_save_results_json(self, console, tmp_path):
         """Test saving results to JSON file."""
         # Create sample results
         results = [
@@ -102,27 +210,51 @@ class TestBatchProcessing:
             {'file': 'song2.mp3', 'bpm': 128.0, 'key_string': 'D minor'}
         ]
 
-        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
-            output_path = f.name
+        output_path = str(tmp_path / 'results.json')
 
-        try:
-            save_results(results, output_path, console)
+        save_results(results, output_path, console)
 
-            # Verify file exists and contains correct data
-            assert os.path.exists(output_path)
+        # Verify file exists and contains correct data
+        assert os.path.exists(output_path)
 
-            with open(output_path, 'r') as f:
-                loaded_data = json.load(f)
+        with open(output_path, 'r') as f:
+            loaded_data = json.load(f)
 
-            assert len(loaded_data) == 2
-            assert loaded_data[0]['bpm'] == 120.5
-            assert loaded_data[1]['key_string'] == 'D minor'
+        assert len(loaded_data) == 2
+        assert loaded_data[0]['bpm'] == 120.5
+        assert loaded_data[1]['key_string'] == 'D minor'
 
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+    def test_save_results_json_large_batch(self, console, tmp_path):
+        """Test that large batches are streamed to valid JSON."""
+        results = [
+            {'file': f'song{i}.mp3', 'bpm': 100.0 + i, 'key_string': 'C major'}
+            for i in range(1500)
+        ]
+        output_path = tmp_path / 'results.json'
+
+        save_results(results, str(output_path), console)
+
+        with open(output_path, 'r') as f:
+            loaded_data = json.load(f)
+
+        assert loaded_data == results
+
+    def test_save_results_jsonl(self, console, tmp_path):
+        """Test saving results to a JSON Lines file."""
+        results = [
+            {'file': 'song1.mp3', 'bpm': 120.5, 'key_string': 'C major'},
+            {'file': 'song2.mp3', 'bpm': 128.0, 'key_string': 'D minor'}
+        ]
+        output_path = str(tmp_path / 'results.jsonl')
 
-    def test_save_results_csv(self, console):
+        save_results(results, output_path, console)
+
+        with open(output_path, 'r') as f:
+            loaded_data = [json.loads(line) for line in f]
+
+        assert loaded_data == results
+
+    def test_save_results_csv(self, console, tmp_path):
         """Test saving results to CSV file."""
         results = [
             {
@@ -153,46 +285,37 @@ class TestBatchProcessing:
             }
         ]
 
-        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
-            output_path = f.name
+        output_path = str(tmp_path / 'results.csv')
 
-        try:
-            save_results(results, output_path, console)
+        save_results(results, output_path, console)
 
-            # Verify file exists and contains correct data
-            assert os.path.exists(output_path)
+        # Verify file exists and contains correct data
+        assert os.path.exists(output_path)
 
-            with open(output_path, 'r', newline='') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
+        with open(output_path, 'r', newline='') as f:
+            header, *rows = csv.reader(f)
 
-            assert len(rows) == 2
-            assert float(rows[0]['bpm']) == 120.5
-            assert rows[0]['key_string'] == 'C major'
-            assert float(rows[1]['bpm']) == 128.0
-            assert rows[1]['key_string'] == 'D minor'
+        assert tuple(header) == CSV_FIELDNAMES
+        bpm_col = header.index('bpm')
+        key_col = header.index('key_string')
 
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+        assert len(rows) == 2
+        assert float(rows[0][bpm_col]) == 120.5
+        assert rows[0][key_col] == 'C major'
+        assert float(rows[1][bpm_col]) == 128.0
+        assert rows[1][key_col] == 'D minor'
 
-    def test_save_results_empty_list(self, console):
+    def test_save_results_empty_list(self, console, tmp_path):
         """Test saving empty results list."""
-        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
-            output_path = f.name
-
-        try:
-            save_results([], output_path, console)
+        output_path = str(tmp_path / 'results.json')
 
-            # File should exist but be empty array
-            with open(output_path, 'r') as f:
-                data = json.load(f)
+        save_results([], output_path, console)
 
-            assert len(data) == 0
+        # File should exist but be empty array
+        with open(output_path, 'r') as f:
+            data = json.load(f)
 
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+        assert len(data) == 0
 
     def test_display_batch_summary(self, console):
         """Test displaying batch summary table."""
@@ -223,31 +346,22 @@ class TestBatchProcessing:
 class TestBatchCLIIntegration:
     """Integration tests for batch processing via CLI."""
 
-    @pytest.fixture
-    def sample_audio_files(self):
-        """Create sample audio files."""
-        import soundfile as sf
+    @pytest.fixture(scope="module")
+    def sample_audio_files(self, tmp_path_factory):
+        """Create sample audio files in their own directory."""
         import numpy as np
 
-        files = []
         sample_rate = 22050
+        audio_dir = tmp_path_factory.mktemp("cli")
 
-        for i in range(2):
-            duration = 2.0
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+        duration = 2.0
+        t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
+        audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+        files = [str(audio_dir / f"tone_{i}.wav") for i in range(2)]
 
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-                temp_path = f.name
-                files.append(temp_path)
+        _write_audio_files(files, [audio] * len(files), sample_rate)
 
-            sf.write(temp_path, audio, sample_rate)
-
-        yield files
-
-        for file_path in files:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        return files
 
     def test_cli_batch_with_wildcard(self, sample_audio_files):
         """Test CLI batch processing with file pattern."""
@@ -302,36 +416,21 @@ class TestBatchEdgeCases:
         # All should fail, so results should be empty
         assert len(results) == 0
 
-    def test_mixed_file_formats(self):
+    def test_mixed_file_formats(self, analyzer, console, tmp_path):
         """Test batch processing with different audio formats."""
-        import soundfile as sf
         import numpy as np
 
-        files = []
         sample_rate = 22050
+        duration = 2.0
+        t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
+        audio = 0.5 * np.sin(2 * np.pi * 440 * t)
 
-        # Create files with different extensions
-        for ext in ['.wav', '.flac']:
-            duration = 2.0
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            audio = 0.5 * np.sin(2 * np.pi * 440 * t)
-
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as f:
-                temp_path = f.name
-                files.append(temp_path)
-
-            sf.write(temp_path, audio, sample_rate, format=ext[1:].upper())
+        # Create files with different extensions; soundfile picks the
+        # format from the extension
+        files = [str(tmp_path / f"tone{ext}") for ext in ['.wav', '.flac']]
+        _write_audio_files(files, [audio] * len(files), sample_rate)
 
-        try:
-            analyzer = AudioAnalyzer(verbose=False)
-            console = Console()
-
-            results = analyze_batch(analyzer, files, continue_on_error=True, console=console)
+        results = analyze_batch(analyzer, files, continue_on_error=True, console=console)
 
-            # Should successfully analyze both formats
-            assert len(results) == 2
-
-        finally:
-            for file_path in files:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+        # Should successfully analyze both formats
+        assert len(results) == 2
@@ -4,6 +4,7 @@ Unit tests for the bpm_detector module.
 
 import pytest
 import numpy as np
+import scipy.signal
 import os
 import sys
 
@@ -12,37 +13,76 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from bpm_detector import BPMDetector
 
 
+def _gen_sine(n, freq, sr, dtype=np.float32):
+    """
+    Generate a unit sine wave with a two-term recurrence instead of np.sin.
+
+    The impulse response of 1 / (1 - 2cos(w)z^-1 + z^-2), scaled by
+    sin(w)z^-1, is sin(w * k); the recurrence runs in float64 to keep
+    rounding error from accumulating and is cast at the end.
+    """
+    omega = 2 * np.pi * freq / sr
+    impulse = np.zeros(n)
+    impulse[0] = 1.0
+    sine = scipy.signal.lfilter([0.0, np.sin(omega)], [1.0, -2 * np.cos(omega), 1.0], impulse)
+    return sine.astype(dtype)
+
+
+@pytest.fixture(scope="module")
+def detector():
+    """Create one BPMDetector shared by all tests in the module."""
+    return BPMDetector()
+
+
+@pytest.fixture(scope="module")
+def noise_buffers():
+    """Deterministic signals for the edge-case tests, built once."""
+    rng = np.random.default_rng(0)
+    buffers = {
+        "short": rng.standard_normal(22050 * 3).astype(np.float32),
+        "long": rng.standard_normal(22050 * 30).astype(np.float32),
+    }
+
+    # Clipped audio (values at -1 and 1) with some variation
+    clipped = np.ones(22050 * 3, dtype=np.float32)
+    clipped[::100] = -1.0
+    buffers["clipped"] = clipped
+
+    for buffer in buffers.values():
+        buffer.flags.writeable = False
+    return buffers
+
+
 class TestBPMDetector:
     """Test suite for BPMDetector class."""
 
-    @pytest.fixture
-    def detector(self):
-        """Create a BPMDetector instance for testing."""
-        return BPMDetector()
-
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_audio(self):
-        """Create sample audio data for testing."""
+        """Create sample audio data once for all tests in the module."""
         sample_rate = 22050
         duration = 5.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
+        n = int(sample_rate * duration)
 
         # Create audio with a clear beat at 120 BPM
         # 120 BPM = 2 beats per second
         beat_frequency = 2.0
-        audio = 0.5 * np.sin(2 * np.pi * 440 * t)  # Base tone
+
+        # Base tone
+        audio = _gen_sine(n, 440, sample_rate)
+        audio *= 0.5
 
         # Add periodic beats
         beat_period = sample_rate / beat_frequency
-        beat_envelope = np.zeros_like(t)
-        for i in range(int(duration * beat_frequency)):
-            start = int(i * beat_period)
-            end = min(start + int(beat_period * 0.1), len(beat_envelope))
-            beat_envelope[start:end] = 1.0
+        beat_envelope = np.full(n, 0.3, dtype=np.float32)
+        starts = (np.arange(int(duration * beat_frequency)) * beat_period).astype(int)
+        idx = (starts[:, None] + np.arange(int(beat_period * 0.1))).ravel()
+        beat_envelope[idx[idx < n]] = 1.0
 
-        audio = audio * (0.3 + 0.7 * beat_envelope)
+        audio *= beat_envelope
 
-        return audio.astype(np.float32)
+        # Shared between tests, so guard against accidental mutation
+        audio.flags.writeable = False
+        return audio
 
     def test_init_default_sample_rate(self):
         """Test initialization with default sample rate."""
@@ -94,51 +134,40 @@ class TestBPMDetector:
         assert isinstance(bpm, float)
         assert bpm > 0
 
-    def test_get_confidence_level_high(self, detector):
-        """Test confidence level for high confidence."""
-        assert detector.get_confidence_level(0.8) == "High"
-        assert detector.get_confidence_level(0.7) == "High"
-
-    def test_get_confidence_level_medium(self, detector):
-        """Test confidence level for medium confidence."""
-        assert detector.get_confidence_level(0.6) == "Medium"
-        assert detector.get_confidence_level(0.5) == "Medium"
-        assert detector.get_confidence_level(0.4) == "Medium"
-
-    def test_get_confidence_level_low(self, detector):
-        """Test confidence level for low confidence."""
-        assert detector.get_confidence_level(0.3) == "Low"
-        assert detector.get_confidence_level(0.1) == "Low"
-        assert detector.get_confidence_level(0.0) == "Low"
-
-    def test_get_confidence_level_boundary(self, detector):
-        """Test confidence level at boundaries."""
-        assert detector.get_confidence_level(0.69) == "Medium"
-        assert detector.get_confidence_level(0.70) == "High"
-        assert detector.get_confidence_level(0.39) == "Low"
-        assert detector.get_confidence_level(0.40) == "Medium"
-
-    def test_validate_bpm_valid_range(self, detector):
-        """Test BPM validation for valid values."""
-        assert detector.validate_bpm(60.0) is True
-        assert detector.validate_bpm(120.0) is True
-        assert detector.validate_bpm(180.0) is True
-        assert detector.validate_bpm(40.0) is True
-        assert detector.validate_bpm(240.0) is True
-
-    def test_validate_bpm_invalid_range(self, detector):
-        """Test BPM validation for invalid values."""
-        assert detector.validate_bpm(30.0) is False
-        assert detector.validate_bpm(250.0) is False
-        assert detector.validate_bpm(0.0) is False
-        assert detector.validate_bpm(-60.0) is False
-
-    def test_validate_bpm_boundary(self, detector):
-        """Test BPM validation at boundaries."""
-        assert detector.validate_bpm(39.9) is False
-        assert detector.validate_bpm(40.0) is True
-        assert detector.validate_bpm(240.0) is True
-        assert detector.validate_bpm(240.1) is False
+    @pytest.mark.parametrize("confidence,level", [
+        # High confidence
+        (0.8, "High"), (0.7, "High"),
+        # Medium confidence
+        (0.6, "Medium"), (0.5, "Medium"), (0.4, "Medium"),
+        # Low confidence
+        (0.3, "Low"), (0.1, "Low"), (0.0, "Low"),
+        # Boundaries
+        (0.69, "Medium"), (0.70, "High"), (0.39, "Low"), (0.40, "Medium"),
+    ])
+    def test_get_confidence_level(self, detector, confidence, level):
+        """Test confidence level thresholds."""
+        assert detector.get_confidence_level(confidence) == level
+
+    # Valid range, invalid range and boundaries
+    BPM_VALIDITY = [
+        (60.0, True), (120.0, True), (180.0, True), (40.0, True), (240.0, True),
+        (30.0, False), (250.0, False), (0.0, False), (-60.0, False),
+        (39.9, False), (240.1, False),
+    ]
+
+    @pytest.mark.parametrize("bpm,expected", BPM_VALIDITY)
+    def test_validate_bpm(self, detector, bpm, expected):
+        """Test BPM validation for a single value."""
+        assert detector.validate_bpm(bpm) is expected
+
+    def test_validate_bpm_array(self, detector):
+        """Test BPM validation for an array of values in one call."""
+        bpms, expected = zip(*self.BPM_VALIDITY)
+
+        valid = detector.validate_bpm(np.array(bpms))
+
+        assert valid.dtype == bool
+        assert np.array_equal(valid, np.array(expected))
 
     def test_detect_with_multiple_estimates(self, detector, sample_audio):
         """Test detection with multiple tempo estimates."""
@@ -159,6 +188,12 @@ class TestBPMDetector:
         with pytest.raises(ValueError, match="Audio data is empty"):
             detector.detect_with_multiple_estimates(np.array([]))
 
+    @pytest.mark.parametrize("n_estimates", [0, -1])
+    def test_detect_with_multiple_estimates_invalid_count(self, detector, sample_audio, n_estimates):
+        """Test requesting fewer than one estimate raises ValueError."""
+        with pytest.raises(ValueError, match="n_estimates"):
+            detector.detect_with_multiple_estimates(sample_audio, n_estimates=n_estimates)
+
     def test_detect_with_multiple_estimates_count(self, detector, sample_audio):
         """Test requesting different numbers of estimates."""
         _, _, alternatives = detector.detect_with_multiple_estimates(
@@ -190,74 +225,57 @@ class TestBPMDetectorWithSyntheticBeats:
 
     def create_beat_pattern(self, bpm, duration=5.0, sample_rate=22050):
         """Helper to create audio with a specific BPM."""
-        t = np.linspace(0, duration, int(sample_rate * duration))
+        n = int(sample_rate * duration)
 
         # Create base tone
-        audio = 0.3 * np.sin(2 * np.pi * 440 * t)
+        audio = _gen_sine(n, 440, sample_rate)
+        audio *= 0.3
 
         # Add beats at specified BPM
         beats_per_second = bpm / 60.0
         beat_period = sample_rate / beats_per_second
 
-        beat_envelope = np.ones_like(t) * 0.3
-        for i in range(int(duration * beats_per_second)):
-            start = int(i * beat_period)
-            end = min(start + int(beat_period * 0.2), len(beat_envelope))
-            beat_envelope[start:end] = 1.0
-
-        audio = audio * beat_envelope
-
-        return audio.astype(np.float32)
+        beat_envelope = np.full(n, 0.3, dtype=np.float32)
+        starts = (np.arange(int(duration * beats_per_second)) * beat_period).astype(int)
+        idx = (starts[:, None] + np.arange(int(beat_period * 0.2))).ravel()
+        beat_envelope[idx[idx < n]] = 1.0
 
-    def test_detect_120_bpm(self):
-        """Test detection of 120 BPM."""
-        detector = BPMDetector()
-        audio = self.create_beat_pattern(120)
-
-        bpm, confidence = detector.detect(audio)
-
-        # Should be close to 120 BPM (within reasonable margin)
-        assert 100 <= bpm <= 140
-
-    def test_detect_80_bpm(self):
-        """Test detection of 80 BPM."""
-        detector = BPMDetector()
-        audio = self.create_beat_pattern(80)
-
-        bpm, confidence = detector.detect(audio)
+        audio *= beat_envelope
 
-        # Should be close to 80 BPM (within reasonable margin)
-        assert 60 <= bpm <= 100
+        return audio
 
-    def test_detect_140_bpm(self):
-        """Test detection of 140 BPM."""
-        detector = BPMDetector()
-        audio = self.create_beat_pattern(140)
+    @pytest.mark.parametrize("bpm_target,lo,hi", [
+        (120, 100, 140),
+        (80, 60, 100),
+        (140, 120, 160),
+    ])
+    def test_detect_bpm(self, detector, bpm_target, lo, hi):
+        """Test detection of a known BPM."""
+        audio = self.create_beat_pattern(bpm_target)
 
         bpm, confidence = detector.detect(audio)
 
-        # Should be close to 140 BPM (within reasonable margin)
-        assert 120 <= bpm <= 160
+        # Should be close to the target BPM (within reasonable margin)
+        assert lo <= bpm <= hi
 
-    def test_different_sample_rates(self):
+    @pytest.mark.parametrize("sample_rate", [22050, 44100])
+    def test_different_sample_rates(self, sample_rate):
         """Test detection works with different sample rates."""
-        for sample_rate in [22050, 44100]:
-            detector = BPMDetector(sample_rate=sample_rate)
-            audio = self.create_beat_pattern(120, sample_rate=sample_rate)
+        detector = BPMDetector(sample_rate=sample_rate)
+        audio = self.create_beat_pattern(120, sample_rate=sample_rate)
 
-            bpm, confidence = detector.detect(audio)
+        bpm, confidence = detector.detect(audio)
 
-            # Should detect reasonable BPM regardless of sample rate
-            assert 40 <= bpm <= 240
+        # Should detect reasonable BPM regardless of sample rate
+        assert 40 <= bpm <= 240
 
 
 class TestBPMDetectorEdgeCases:
     """Test edge cases and boundary conditions."""
 
-    def test_white_noise(self):
+    def test_white_noise(self, detector, noise_buffers):
         """Test detection with white noise."""
-        detector = BPMDetector()
-        noise = np.random.randn(detector.sample_rate * 3)
+        noise = noise_buffers["short"]
 
         # Should not crash, but may have low confidence
         bpm, confidence = detector.detect(noise)
@@ -270,8 +288,7 @@ class TestBPMDetectorEdgeCases:
     def test_sine_wave_no_beats(self):
         """Test detection with pure sine wave (no clear beats)."""
         detector = BPMDetector()
-        t = np.linspace(0, 3.0, int(detector.sample_rate * 3))
-        audio = np.sin(2 * np.pi * 440 * t)
+        audio = _gen_sine(detector.sample_rate * 3, 440, detector.sample_rate)
 
         # Should detect something, even if not meaningful
         bpm, confidence = detector.detect(audio)
@@ -279,11 +296,10 @@ class TestBPMDetectorEdgeCases:
         assert isinstance(bpm, float)
         assert bpm > 0
 
-    def test_very_long_audio(self):
+    def test_very_long_audio(self, detector, noise_buffers):
         """Test detection with long audio."""
-        detector = BPMDetector()
-        # Create 30 seconds of audio
-        long_audio = np.random.randn(detector.sample_rate * 30)
+        # 30 seconds of audio
+        long_audio = noise_buffers["long"]
 
         # Should handle long audio without issues
         bpm, confidence = detector.detect(long_audio)
@@ -291,12 +307,9 @@ class TestBPMDetectorEdgeCases:
         assert isinstance(bpm, float)
         assert bpm > 0
 
-    def test_clipped_audio(self):
+    def test_clipped_audio(self, detector, noise_buffers):
         """Test detection with clipped audio."""
-        detector = BPMDetector()
-        # Create clipped audio (values at -1 and 1)
-        audio = np.ones(detector.sample_rate * 3)
-        audio[::100] = -1.0  # Add some variation
+        audio = noise_buffers["clipped"]
 
         # Should not crash
         bpm, confidence = detector.detect(audio)
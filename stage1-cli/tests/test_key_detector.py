@@ -9,32 +9,50 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from key_detector import KeyDetector
+from key_detector import KeyDetector, _key_scores
 
 
-class TestKeyDetector:
-    """Test suite for KeyDetector class."""
+def create_chord_audio(frequencies, duration=5.0, sample_rate=22050):
+    """Helper to create audio with specific frequencies (chord)."""
+    t = np.arange(int(sample_rate * duration), dtype=np.float32) * np.float32(1.0 / sample_rate)
+
+    audio = np.zeros_like(t)
+    inv = np.float32(1.0 / len(frequencies))
+    for freq in frequencies:
+        audio += np.sin(np.float32(2 * np.pi * freq) * t) * inv
+
+    return audio
+
+
+@pytest.fixture(scope="module")
+def detector():
+    """Create one KeyDetector shared by all tests in the module."""
+    return KeyDetector()
+
+
+@pytest.fixture(scope="module")
+def sample_audio():
+    """Create sample audio data for testing."""
+    sample_rate = 22050
+    duration = 5.0
+    t = np.arange(int(sample_rate * duration), dtype=np.float32) * np.float32(1.0 / sample_rate)
+
+    # Create audio with C major chord (C, E, G)
+    audio = np.zeros_like(t)
+    for freq in (261.63, 329.63, 392.00):  # C4, E4, G4
+        audio += np.float32(0.33) * np.sin(np.float32(2 * np.pi * freq) * t)
 
-    @pytest.fixture
-    def detector(self):
-        """Create a KeyDetector instance for testing."""
-        return KeyDetector()
+    return audio
 
-    @pytest.fixture
-    def sample_audio(self):
-        """Create sample audio data for testing."""
-        sample_rate = 22050
-        duration = 5.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
 
-        # Create audio with C major chord (C, E, G)
-        audio = (
-            0.33 * np.sin(2 * np.pi * 261.63 * t) +  # C4
-            0.33 * np.sin(2 * np.pi * 329.63 * t) +  # E4
-            0.33 * np.sin(2 * np.pi * 392.00 * t)    # G4
-        )
+@pytest.fixture(scope="module")
+def chord_result(detector, sample_audio):
+    """Detect the key of sample_audio once for the tests that inspect it."""
+    return detector.detect(sample_audio)
 
-        return audio.astype(np.float32)
+
+class TestKeyDetector:
+    """Test suite for KeyDetector class."""
 
     def test_init_default_sample_rate(self):
         """Test initialization with default sample rate."""
@@ -46,6 +64,14 @@ class TestKeyDetector:
         detector = KeyDetector(sample_rate=44100)
         assert detector.sample_rate == 44100
 
+    def test_filter_bank_shared_between_instances(self, detector):
+        """Test detectors at the same sample rate share one chroma filter bank."""
+        other = KeyDetector()
+
+        assert other._chroma_filter is detector._chroma_filter
+        assert other._chroma_filter.shape == (12, KeyDetector.N_FFT // 2 + 1)
+        assert not other._chroma_filter.flags.writeable
+
     def test_pitch_classes_count(self, detector):
         """Test that all 12 pitch classes are defined."""
         assert len(detector.PITCH_CLASSES) == 12
@@ -58,15 +84,31 @@ class TestKeyDetector:
         """Test that minor profile has 12 values."""
         assert len(detector.MINOR_PROFILE) == 12
 
-    def test_detect_success(self, detector, sample_audio):
-        """Test successful key detection."""
-        key, mode, confidence = detector.detect(sample_audio)
+    def test_detect_success(self, chord_result):
+        """Test successful key detection returns the expected types."""
+        key, mode, confidence = chord_result
 
         assert isinstance(key, str)
         assert isinstance(mode, str)
         assert isinstance(confidence, float)
+
+    def test_detect_key_and_mode_valid(self, detector, chord_result):
+        """Test detected key and mode are valid names."""
+        key, mode, _ = chord_result
+
         assert key in detector.PITCH_CLASSES
         assert mode in ['major', 'minor']
+
+    def test_detect_c_major_sample(self, chord_result):
+        """Test the C major sample chord is detected as C major."""
+        key, mode, _ = chord_result
+
+        assert (key, mode) == ('C', 'major')
+
+    def test_detect_confidence_range(self, chord_result):
+        """Test detected confidence is within 0-1."""
+        _, _, confidence = chord_result
+
         assert 0.0 <= confidence <= 1.0
 
     def test_detect_empty_audio(self, detector):
@@ -155,19 +197,28 @@ class TestKeyDetector:
         # A minor dominant is E minor
         assert related['dominant'] == 'E minor'
 
+    def test_get_relative_keys_read_only(self, detector):
+        """Test the shared related-keys mapping cannot be modified."""
+        related = detector.get_relative_keys('C', 'major')
+
+        with pytest.raises(TypeError):
+            related['relative'] = 'E minor'
+
+        assert detector.get_relative_keys('C', 'major')['relative'] == 'A minor'
+
     def test_get_scale_notes_c_major(self, detector):
         """Test getting scale notes for C major."""
         scale = detector.get_scale_notes('C', 'major')
 
         assert len(scale) == 7
-        assert scale == ['C', 'D', 'E', 'F', 'G', 'A', 'B']
+        assert scale == ('C', 'D', 'E', 'F', 'G', 'A', 'B')
 
     def test_get_scale_notes_a_minor(self, detector):
         """Test getting scale notes for A minor (natural)."""
         scale = detector.get_scale_notes('A', 'minor')
 
         assert len(scale) == 7
-        assert scale == ['A', 'B', 'C', 'D', 'E', 'F', 'G']
+        assert scale == ('A', 'B', 'C', 'D', 'E', 'F', 'G')
 
     def test_get_scale_notes_g_major(self, detector):
         """Test getting scale notes for G major."""
@@ -189,102 +240,112 @@ class TestKeyDetector:
 class TestKeyDetectorWithSyntheticAudio:
     """Test key detection with synthetic audio patterns."""
 
-    def create_chord_audio(self, frequencies, duration=5.0, sample_rate=22050):
-        """Helper to create audio with specific frequencies (chord)."""
-        t = np.linspace(0, duration, int(sample_rate * duration))
-
-        audio = np.zeros_like(t)
-        for freq in frequencies:
-            audio += np.sin(2 * np.pi * freq * t) / len(frequencies)
-
-        return audio.astype(np.float32)
-
-    def test_detect_c_major_chord(self):
+    def test_detect_c_major_chord(self, detector):
         """Test detection with C major chord."""
-        detector = KeyDetector()
-
         # C major chord: C, E, G
         frequencies = [261.63, 329.63, 392.00]
-        audio = self.create_chord_audio(frequencies)
+        audio = create_chord_audio(frequencies)
 
         key, mode, confidence = detector.detect(audio)
 
-        # Should detect C or related key
-        assert key in detector.PITCH_CLASSES
-        assert mode in ['major', 'minor']
+        assert (key, mode) == ('C', 'major')
 
-    def test_detect_a_minor_chord(self):
+    def test_detect_a_minor_chord(self, detector):
         """Test detection with A minor chord."""
-        detector = KeyDetector()
-
         # A minor chord: A, C, E
         frequencies = [220.00, 261.63, 329.63]
-        audio = self.create_chord_audio(frequencies)
+        audio = create_chord_audio(frequencies)
 
         key, mode, confidence = detector.detect(audio)
 
-        # Should detect A minor or related key
-        assert key in detector.PITCH_CLASSES
-        assert mode in ['major', 'minor']
+        assert (key, mode) == ('A', 'minor')
 
-    def test_detect_with_octaves(self):
-        """Test detection with notes in different octaves."""
-        detector = KeyDetector()
+    @pytest.mark.parametrize("mode", ['major', 'minor'])
+    @pytest.mark.parametrize("root", range(12))
+    def test_detect_all_triads(self, detector, root, mode):
+        """Test every major and minor triad, doubled an octave up, is detected exactly."""
+        root_freq = 261.63 * 2 ** (root / 12)
+        third = 4 if mode == 'major' else 3
+        triad = [root_freq * 2 ** (step / 12) for step in (0, third, 7)]
+        audio = create_chord_audio(triad + [2 * freq for freq in triad])
+
+        key, detected_mode, _ = detector.detect(audio)
+
+        assert (key, detected_mode) == (detector.PITCH_CLASSES[root], mode)
+
+    def test_detect_short_notes(self, detector):
+        """Test an arpeggio of 50 ms notes is detected like the sustained chord."""
+        sample_rate = detector.sample_rate
+        n_samples = 5 * sample_rate
+        note_length = int(0.05 * sample_rate)
+        t = np.arange(note_length, dtype=np.float32) * np.float32(1.0 / sample_rate)
+
+        # C, E, G in turn, one short note every 250 ms
+        audio = np.zeros(n_samples, dtype=np.float32)
+        for i, start in enumerate(range(0, n_samples - note_length, sample_rate // 4)):
+            freq = (261.63, 329.63, 392.00)[i % 3]
+            audio[start:start + note_length] = np.sin(np.float32(2 * np.pi * freq) * t)
+
+        key, mode, _ = detector.detect(audio)
+
+        assert (key, mode) == ('C', 'major')
 
+    def test_detect_with_octaves(self, detector):
+        """Test detection with notes in different octaves."""
         # C notes in different octaves
         frequencies = [130.81, 261.63, 523.25]  # C3, C4, C5
-        audio = self.create_chord_audio(frequencies)
+        audio = create_chord_audio(frequencies)
 
         key, mode, confidence = detector.detect(audio)
 
-        # Should detect C-based key
-        assert key in detector.PITCH_CLASSES
+        # Only C is present, so the root must be C
+        assert key == 'C'
 
 
 class TestKeyDetectorCorrelation:
-    """Test the correlation calculation used in key detection."""
-
-    def test_correlation_identical_arrays(self):
-        """Test correlation with identical arrays."""
-        detector = KeyDetector()
+    """Test the profile correlation behind detect()."""
 
-        x = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
-        corr = detector._correlation(x, x)
-
-        # Perfect correlation should be 1.0
-        assert abs(corr - 1.0) < 0.01
+    def test_confidence_matches_profile_correlation(self, detector):
+        """Test detect() confidence is the Pearson correlation with the chosen profile."""
+        audio = create_chord_audio([261.63, 329.63, 392.00])
+        key, mode, confidence = detector.detect(audio)
 
-    def test_correlation_opposite_arrays(self):
-        """Test correlation with opposite arrays."""
-        detector = KeyDetector()
+        chroma = detector._chromagram(audio)
+        chroma /= chroma.max(axis=0, keepdims=True) + 1e-10
+        profile = detector.MAJOR_PROFILE if mode == 'major' else detector.MINOR_PROFILE
+        shift = detector.PITCH_CLASSES.index(key)
+        expected = np.corrcoef(chroma.mean(axis=1), np.roll(profile, shift))[0, 1]
 
-        x = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
-        y = -x
+        assert abs(confidence - (expected + 1) / 2) < 1e-5
 
-        corr = detector._correlation(x, y)
+    def test_transposed_chord_rotates_key(self, detector):
+        """Test transposing a chord up two semitones moves the detected key by two."""
+        c_major = create_chord_audio([261.63, 329.63, 392.00])
+        d_major = create_chord_audio([freq * 2 ** (2 / 12) for freq in (261.63, 329.63, 392.00)])
 
-        # Perfect negative correlation should be -1.0
-        assert abs(corr - (-1.0)) < 0.01
+        c_key, c_mode, c_confidence = detector.detect(c_major)
+        d_key, d_mode, d_confidence = detector.detect(d_major)
 
-    def test_correlation_uncorrelated_arrays(self):
-        """Test correlation with uncorrelated arrays."""
-        detector = KeyDetector()
+        assert (c_key, c_mode) == ('C', 'major')
+        assert (d_key, d_mode) == ('D', 'major')
+        assert abs(c_confidence - d_confidence) < 0.05
 
-        x = np.array([1.0, 2.0, 1.0, 2.0, 1.0])
-        y = np.array([1.0, 1.0, 2.0, 2.0, 1.0])
+    def test_key_scores_match_corrcoef(self, detector):
+        """Test the fused chroma kernel returns the correlation with every profile."""
+        chroma = np.random.default_rng(0).random((12, 100)).astype(np.float32)
+        distribution = chroma.mean(axis=1)
 
-        corr = detector._correlation(x, y)
+        scores = _key_scores(chroma, detector._profiles)
+        expected = [np.corrcoef(distribution, profile)[0, 1] for profile in detector._profiles]
 
-        # Should be between -1 and 1
-        assert -1.0 <= corr <= 1.0
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
 
 
 class TestKeyDetectorEdgeCases:
     """Test edge cases and boundary conditions."""
 
-    def test_white_noise(self):
+    def test_white_noise(self, detector):
         """Test detection with white noise."""
-        detector = KeyDetector()
         noise = np.random.randn(detector.sample_rate * 3)
 
         # Should not crash, should return valid results
@@ -295,9 +356,8 @@ class TestKeyDetectorEdgeCases:
         # Confidence might be lower for random noise
         assert 0.0 <= confidence <= 1.0
 
-    def test_sine_wave_single_note(self):
+    def test_sine_wave_single_note(self, detector):
         """Test detection with a single note."""
-        detector = KeyDetector()
         t = np.linspace(0, 3.0, int(detector.sample_rate * 3))
 
         # A440 (A note)
@@ -308,10 +368,8 @@ class TestKeyDetectorEdgeCases:
         # Should detect A or related key
         assert key in detector.PITCH_CLASSES
 
-    def test_very_long_audio(self):
+    def test_very_long_audio(self, detector):
         """Test detection with long audio."""
-        detector = KeyDetector()
-
         # Create 30 seconds of audio
         long_audio = np.random.randn(detector.sample_rate * 30)
 
@@ -321,43 +379,41 @@ class TestKeyDetectorEdgeCases:
         assert key in detector.PITCH_CLASSES
         assert mode in ['major', 'minor']
 
-    def test_all_keys_have_seven_notes(self):
-        """Test that all keys produce 7-note scales."""
-        detector = KeyDetector()
+    def test_long_audio_uses_central_excerpt(self, detector):
+        """Test that long audio is analyzed over its central excerpt only."""
+        sample_rate = detector.sample_rate
+        max_samples = detector.MAX_ANALYSIS_SECONDS * sample_rate
+        long_audio = np.random.default_rng(0).standard_normal(max_samples * 2).astype(np.float32)
+        start = max_samples // 2
 
-        for key in detector.PITCH_CLASSES:
-            for mode in ['major', 'minor']:
-                scale = detector.get_scale_notes(key, mode)
-                assert len(scale) == 7, f"Scale for {key} {mode} should have 7 notes"
+        assert detector.detect(long_audio) == detector.detect(long_audio[start:start + max_samples])
 
-    def test_all_keys_have_relative_keys(self):
-        """Test that all keys have relative keys defined."""
-        detector = KeyDetector()
+    @pytest.mark.parametrize("mode", ['major', 'minor'])
+    @pytest.mark.parametrize("key", KeyDetector.PITCH_CLASSES)
+    def test_all_keys_have_seven_notes(self, detector, key, mode):
+        """Test that all keys produce 7-note scales."""
+        scale = detector.get_scale_notes(key, mode)
+        assert len(scale) == 7, f"Scale for {key} {mode} should have 7 notes"
 
-        for key in detector.PITCH_CLASSES:
-            for mode in ['major', 'minor']:
-                related = detector.get_relative_keys(key, mode)
-                assert 'relative' in related
-                assert 'parallel' in related
-                assert 'dominant' in related
+    @pytest.mark.parametrize("mode", ['major', 'minor'])
+    @pytest.mark.parametrize("key", KeyDetector.PITCH_CLASSES)
+    def test_all_keys_have_relative_keys(self, detector, key, mode):
+        """Test that all keys have relative keys defined."""
+        related = detector.get_relative_keys(key, mode)
+        assert 'relative' in related
+        assert 'parallel' in related
+        assert 'dominant' in related
 
-    def test_silent_audio(self):
+    def test_silent_audio(self, detector):
         """Test detection with silent audio (all zeros)."""
-        detector = KeyDetector()
         silence = np.zeros(detector.sample_rate * 3)
 
-        # Should not crash
-        try:
-            key, mode, confidence = detector.detect(silence)
-            assert key in detector.PITCH_CLASSES
-            assert mode in ['major', 'minor']
-        except RuntimeError:
-            # It's acceptable to fail on silence
-            pass
-
-    def test_clipped_audio(self):
+        # Silence is rejected up front rather than analyzed
+        with pytest.raises(RuntimeError, match="silent"):
+            detector.detect(silence)
+
+    def test_clipped_audio(self, detector):
         """Test detection with clipped audio."""
-        detector = KeyDetector()
         # Create clipped audio (values at extremes)
         audio = np.ones(detector.sample_rate * 3)
         audio[::2] = -1.0
@@ -4,6 +4,7 @@ Installation verification script.
 Checks that all dependencies are installed and working.
 """
 
+import importlib.util
 import sys
 
 
@@ -30,16 +31,42 @@ def check_imports():
 
     all_ok = True
     for package, name in packages.items():
-        try:
-            __import__(package)
+        ok, error = _try_import(package)
+        if ok:
             print(f"✅ {name}")
-        except ImportError as e:
-            print(f"❌ {name} - {e}")
+        else:
+            print(f"❌ {name} - {error}")
             all_ok = False
 
     return all_ok
 
 
+def check_optional_packages():
+    """Report which optional speed-up packages are installed."""
+    packages = {
+        'orjson': 'orjson (faster JSON export)',
+        'pyfftw': 'pyFFTW (faster FFTs)'
+    }
+
+    # Optional extras are only probed for presence; the program falls back
+    # gracefully when they are missing
+    for package, name in packages.items():
+        if importlib.util.find_spec(package) is not None:
+            print(f"✅ {name}")
+        else:
+            print(f"➖ {name} - not installed (optional)")
+
+
+def _try_import(name):
+    """Import a module, returning (ok, error)."""
+    try:
+        __import__(name)
+        return True, None
+    except (ImportError, OSError) as e:
+        # sounddevice raises OSError when the PortAudio library is missing
+        return False, e
+
+
 def check_modules():
     """Check that custom modules can be imported."""
     sys.path.insert(0, 'src')
@@ -53,11 +80,11 @@ def check_modules():
 
     all_ok = True
     for module in modules:
-        try:
-            __import__(module)
+        ok, error = _try_import(module)
+        if ok:
             print(f"✅ {module}.py")
-        except ImportError as e:
-            print(f"❌ {module}.py - {e}")
+        else:
+            print(f"❌ {module}.py - {error}")
             all_ok = False
 
     return all_ok
@@ -76,8 +103,8 @@ def test_basic_functionality():
         # Create test audio
         sample_rate = 22050
         duration = 2.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        test_audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+        t = np.arange(int(sample_rate * duration), dtype=np.float32) * np.float32(1.0 / sample_rate)
+        test_audio = np.float32(0.5) * np.sin(np.float32(2 * np.pi * 440) * t)
 
         # Test audio processor
         processor = AudioProcessor()
@@ -124,6 +151,10 @@ def main():
     imports_ok = check_imports()
     print()
 
+    print("Checking optional packages...")
+    check_optional_packages()
+    print()
+
     print("Checking custom modules...")
     modules_ok = check_modules()
     print()
@@ -7,10 +7,20 @@ to detect BPM (tempo) and musical key.
 """
 
 import argparse
+import copy
+import csv
+import functools
+import hashlib
+import os
 import sys
 import time
 import json
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
+import librosa
+import scipy.fft
 from pathlib import Path
 from typing import Optional
 
@@ -19,41 +29,204 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 from rich.table import Table
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON export
+    orjson = None
+
 from audio_processor import AudioProcessor
 from bpm_detector import BPMDetector
 from key_detector import KeyDetector
 
 
+class _ParallelScipyFFT:
+    """Drop-in for scipy.fft that runs transforms on several CPU cores."""
+
+    _TRANSFORMS = {'fft', 'ifft', 'rfft', 'irfft', 'fftn', 'ifftn',
+                   'rfftn', 'irfftn', 'dct', 'idct'}
+
+    def __init__(self, workers: int = -1):
+        """
+        Initialize the wrapper.
+
+        Args:
+            workers: Threads per transform (-1 uses all CPU cores)
+        """
+        self.workers = workers
+
+    def __getattr__(self, name):
+        attr = getattr(scipy.fft, name)
+        if name in self._TRANSFORMS:
+            return functools.partial(attr, workers=self.workers)
+        return attr
+
+
+def _configure_fft_backend(threads: Optional[int] = None) -> str:
+    """
+    Point librosa at the fastest available FFT implementation.
+
+    Uses pyFFTW with its plan cache when installed, otherwise falls back
+    to multi-threaded scipy.fft.
+
+    Args:
+        threads: Threads per transform (None uses all CPU cores)
+
+    Returns:
+        Name of the selected backend ("pyfftw" or "scipy")
+    """
+    try:
+        import pyfftw
+        import pyfftw.interfaces.numpy_fft as fft_lib
+
+        pyfftw.config.NUM_THREADS = threads or os.cpu_count() or 1
+        pyfftw.interfaces.cache.enable()
+        pyfftw.interfaces.cache.set_keepalive_time(60)
+        backend = 'pyfftw'
+    except ImportError:
+        fft_lib = _ParallelScipyFFT(workers=threads or -1)
+        backend = 'scipy'
+
+    with warnings.catch_warnings():
+        # set_fftlib is deprecated (but still supported) as of librosa 0.11
+        warnings.simplefilter('ignore', FutureWarning)
+        librosa.set_fftlib(fft_lib)
+
+    return backend
+
+
+# FFT library used by librosa for every STFT/onset computation
+FFT_BACKEND = _configure_fft_backend()
+
+
 class NumpyEncoder(json.JSONEncoder):
     """Custom JSON encoder for numpy types."""
     def default(self, obj):
-        if isinstance(obj, (np.integer, np.int32, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float32, np.float64)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
+        if isinstance(obj, np.ndarray):
             return obj.tolist()
+        # Every numpy scalar (int*, float*, bool_) converts via .item()
+        if hasattr(obj, 'item'):
+            return obj.item()
         return super().default(obj)
 
 
 class AudioAnalyzer:
     """Main analyzer class that coordinates audio processing and analysis."""
 
-    def __init__(self, verbose: bool = False):
+    # Maximum number of cached file results (least recently used are evicted)
+    CACHE_SIZE = 1024
+    # Bytes hashed from each end of a file to build its cache key
+    CACHE_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, verbose: bool = False,
+                 max_analysis_seconds: Optional[float] = AudioProcessor.DEFAULT_MAX_ANALYSIS_SECONDS,
+                 use_cache: bool = False):
         """
         Initialize the analyzer.
 
         Args:
             verbose: Enable verbose output
+            max_analysis_seconds: Analyze at most this many seconds from the
+                middle of each file (None analyzes the whole file)
+            use_cache: Reuse results for files whose content was already analyzed
         """
         self.verbose = verbose
         self.console = Console()
+        self.use_cache = use_cache
+        self._cache = OrderedDict()
 
         # Initialize processors and detectors
-        self.audio_processor = AudioProcessor()
+        self.audio_processor = AudioProcessor(max_analysis_seconds=max_analysis_seconds)
         self.bpm_detector = BPMDetector()
         self.key_detector = KeyDetector()
 
+    def _create_progress(self) -> Progress:
+        """
+        Create the spinner shown while an analysis is running.
+
+        Returns:
+            Transient Progress bound to this analyzer's console
+        """
+        return Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=self.console,
+            transient=True
+        )
+
+    def _cache_key(self, file_path: str) -> Optional[str]:
+        """
+        Build a content-based cache key for a file.
+
+        Only the file size and the first and last CACHE_CHUNK_SIZE bytes are
+        hashed, so duplicates are found without reading whole files.
+
+        Args:
+            file_path: Path to the audio file
+
+        Returns:
+            Cache key, or None if the file can't be read
+        """
+        try:
+            size = os.path.getsize(file_path)
+            with open(file_path, 'rb') as f:
+                head = f.read(self.CACHE_CHUNK_SIZE)
+                f.seek(max(size - self.CACHE_CHUNK_SIZE, 0))
+                tail = f.read(self.CACHE_CHUNK_SIZE)
+        except OSError:
+            return None
+
+        digest = hashlib.blake2b(head + tail, digest_size=16).hexdigest()
+        return f"{size}:{digest}"
+
+    def _cached_results(self, cache_key: Optional[str], file_path: str) -> Optional[dict]:
+        """
+        Look up cached results for a cache key.
+
+        Args:
+            cache_key: Key from _cache_key (None never hits)
+            file_path: Path the returned results should report
+
+        Returns:
+            Copy of the cached results for file_path, or None on a miss
+        """
+        if cache_key is None or cache_key not in self._cache:
+            return None
+
+        self._cache.move_to_end(cache_key)
+        return self._copy_results(self._cache[cache_key], file_path)
+
+    @staticmethod
+    def _copy_results(results: dict, file_path: str) -> dict:
+        """
+        Copy results of an analysis for a file with identical content.
+
+        Args:
+            results: Results of the original analysis
+            file_path: Path the copy should report
+
+        Returns:
+            Deep copy of results with the file replaced and no analysis time
+        """
+        results = copy.deepcopy(results)
+        results['file'] = file_path
+        results['analysis_time'] = 0.0
+        return results
+
+    def _store_results(self, cache_key: Optional[str], results: dict) -> None:
+        """
+        Add results to the cache, evicting the least recently used entry.
+
+        Args:
+            cache_key: Key from _cache_key (None is not cached)
+            results: Results to cache
+        """
+        if cache_key is None:
+            return
+
+        self._cache[cache_key] = copy.deepcopy(results)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
     def analyze_file(self, file_path: str) -> dict:
         """
         Analyze an audio file.
@@ -75,42 +248,32 @@ class AudioAnalyzer:
         self.console.print(f"\n[bold cyan]Analyzing:[/bold cyan] {Path(file_path).name}")
         self.console.print("━" * 60)
 
-        # Load audio file
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True
-        ) as progress:
-            progress.add_task(description="Loading audio file...", total=None)
-            audio_data, sample_rate = self.audio_processor.load_audio(file_path)
+        # Return cached results for identical content
+        cache_key = self._cache_key(file_path) if self.use_cache else None
+        cached = self._cached_results(cache_key, file_path)
+        if cached is not None:
+            self.console.print("[dim]Using cached analysis[/dim]")
+            return cached
 
-        if self.verbose:
-            duration = self.audio_processor.get_duration(audio_data)
-            self.console.print(f"[dim]Duration: {duration:.2f}s | Sample rate: {sample_rate}Hz[/dim]")
+        with self._create_progress() as progress:
+            # Load audio file
+            task = progress.add_task(description="Loading audio file...", total=None)
+            # Report the whole file's length, even when only an excerpt is analyzed
+            audio_data, sample_rate, duration = self.audio_processor.load_audio_with_duration(file_path)
 
-        # Validate audio
-        if not self.audio_processor.validate_audio(audio_data):
-            raise ValueError("Audio file is invalid or too short for analysis")
+            if self.verbose:
+                self.console.print(f"[dim]Duration: {duration:.2f}s | Sample rate: {sample_rate}Hz[/dim]")
 
-        # Detect BPM
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True
-        ) as progress:
-            progress.add_task(description="Detecting BPM...", total=None)
+            # Validate audio
+            if not self.audio_processor.validate_audio(audio_data):
+                raise ValueError("Audio file is invalid or too short for analysis")
+
+            # Detect BPM
+            progress.update(task, description="Detecting BPM...")
             bpm, bpm_confidence = self.bpm_detector.detect(audio_data)
 
-        # Detect Key
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True
-        ) as progress:
-            progress.add_task(description="Detecting key...", total=None)
+            # Detect Key
+            progress.update(task, description="Detecting key...")
             key, mode, key_confidence = self.key_detector.detect(audio_data)
 
         end_time = time.time()
@@ -128,12 +291,15 @@ class AudioAnalyzer:
             'key_confidence': key_confidence,
             'key_confidence_level': self.key_detector.get_confidence_level(key_confidence),
             'analysis_time': analysis_time,
-            'duration': self.audio_processor.get_duration(audio_data)
+            'duration': duration
         }
 
         if self.verbose:
-            results['scale_notes'] = self.key_detector.get_scale_notes(key, mode)
-            results['relative_keys'] = self.key_detector.get_relative_keys(key, mode)
+            # Plain containers so results can be serialized and edited
+            results['scale_notes'] = list(self.key_detector.get_scale_notes(key, mode))
+            results['relative_keys'] = dict(self.key_detector.get_relative_keys(key, mode))
+
+        self._store_results(cache_key, results)
 
         return results
 
@@ -157,42 +323,25 @@ class AudioAnalyzer:
         self.console.print(f"\n[bold cyan]Recording from microphone:[/bold cyan] {duration}s")
         self.console.print("━" * 60)
 
-        # Record audio
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=False
-        ) as progress:
+        with self._create_progress() as progress:
+            # Record audio
             task = progress.add_task(
                 description=f"Recording for {duration} seconds...",
                 total=None
             )
             audio_data, sample_rate = self.audio_processor.record_audio(duration)
-            progress.update(task, description="Recording complete")
+            self.console.print("Recording complete")
 
-        # Validate audio
-        if not self.audio_processor.validate_audio(audio_data):
-            raise ValueError("Recorded audio is invalid or too short for analysis")
+            # Validate audio
+            if not self.audio_processor.validate_audio(audio_data):
+                raise ValueError("Recorded audio is invalid or too short for analysis")
 
-        # Detect BPM
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True
-        ) as progress:
-            progress.add_task(description="Detecting BPM...", total=None)
+            # Detect BPM
+            progress.update(task, description="Detecting BPM...")
             bpm, bpm_confidence = self.bpm_detector.detect(audio_data)
 
-        # Detect Key
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True
-        ) as progress:
-            progress.add_task(description="Detecting key...", total=None)
+            # Detect Key
+            progress.update(task, description="Detecting key...")
             key, mode, key_confidence = self.key_detector.detect(audio_data)
 
         end_time = time.time()
@@ -214,8 +363,9 @@ class AudioAnalyzer:
         }
 
         if self.verbose:
-            results['scale_notes'] = self.key_detector.get_scale_notes(key, mode)
-            results['relative_keys'] = self.key_detector.get_relative_keys(key, mode)
+            # Plain containers so results can be serialized and edited
+            results['scale_notes'] = list(self.key_detector.get_scale_notes(key, mode))
+            results['relative_keys'] = dict(self.key_detector.get_relative_keys(key, mode))
 
         return results
 
@@ -264,7 +414,49 @@ class AudioAnalyzer:
         )
 
 
-def analyze_batch(analyzer, file_list, continue_on_error, console):
+# Analyzer owned by a batch worker process (see _init_worker)
+_worker_analyzer = None
+
+
+def _init_worker(verbose, max_analysis_seconds, use_cache):
+    """
+    Create the analyzer used by a batch worker process.
+
+    Args:
+        verbose: Enable verbose output (adds scale and related-key info)
+        max_analysis_seconds: Maximum excerpt length to analyze per file
+        use_cache: Reuse results for duplicate files within the worker
+    """
+    global FFT_BACKEND, _worker_analyzer
+
+    # The pool already runs one worker per core; multi-threaded FFTs in
+    # every worker would oversubscribe the CPU
+    FFT_BACKEND = _configure_fft_backend(threads=1)
+
+    _worker_analyzer = AudioAnalyzer(
+        verbose=verbose,
+        max_analysis_seconds=max_analysis_seconds,
+        use_cache=use_cache
+    )
+    _worker_analyzer.key_detector.fft_workers = 1
+    # Progress output from workers would interleave with the batch output
+    _worker_analyzer.console = Console(quiet=True)
+
+
+def _analyze_in_worker(file_path):
+    """
+    Analyze a single file in a batch worker process.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        Dictionary with analysis results
+    """
+    return _worker_analyzer.analyze_file(file_path)
+
+
+def analyze_batch(analyzer, file_list, continue_on_error, console, workers=1):
     """
     Analyze multiple audio files.
 
@@ -273,9 +465,10 @@ def analyze_batch(analyzer, file_list, continue_on_error, console):
         file_list: List of file paths
         continue_on_error: Whether to continue if a file fails
         console: Rich console for output
+        workers: Number of worker processes (1 analyzes in this process)
 
     Returns:
-        List of analysis results
+        List of analysis results, in the same order as file_list
     """
     results_list = []
     failed_files = []
@@ -283,24 +476,29 @@ def analyze_batch(analyzer, file_list, continue_on_error, console):
     console.print(f"\n[bold cyan]Batch Analysis:[/bold cyan] {len(file_list)} files")
     console.print("━" * 60)
 
-    for i, file_path in enumerate(file_list, 1):
-        try:
-            console.print(f"\n[{i}/{len(file_list)}] Analyzing: {Path(file_path).name}")
+    if workers > 1 and len(file_list) > 1:
+        results_list = _analyze_batch_parallel(
+            analyzer, file_list, continue_on_error, console, workers, failed_files
+        )
+    else:
+        for i, file_path in enumerate(file_list, 1):
+            try:
+                console.print(f"\n[{i}/{len(file_list)}] Analyzing: {Path(file_path).name}")
 
-            results = analyzer.analyze_file(file_path)
-            results_list.append(results)
+                results = analyzer.analyze_file(file_path)
+                results_list.append(results)
 
-            # Show quick summary
-            console.print(f"  BPM: {results['bpm']:.1f} | Key: {results['key_string']}")
+                # Show quick summary
+                console.print(f"  BPM: {results['bpm']:.1f} | Key: {results['key_string']}")
 
-        except Exception as e:
-            failed_files.append((file_path, str(e)))
-            console.print(f"  [red]✗ Failed: {e}[/red]")
+            except Exception as e:
+                failed_files.append((file_path, str(e)))
+                console.print(f"  [red]✗ Failed: {e}[/red]")
 
-            if not continue_on_error:
-                console.print(f"\n[bold red]Batch processing stopped.[/bold red]")
-                console.print(f"Use --continue-on-error to skip failed files.\n")
-                raise
+                if not continue_on_error:
+                    console.print(f"\n[bold red]Batch processing stopped.[/bold red]")
+                    console.print(f"Use --continue-on-error to skip failed files.\n")
+                    raise
 
     # Summary
     console.print("\n" + "━" * 60)
@@ -314,6 +512,125 @@ def analyze_batch(analyzer, file_list, continue_on_error, console):
     return results_list
 
 
+def _file_size(file_path):
+    """Return the size of a file in bytes, or 0 if it can't be read."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def _analyze_batch_parallel(analyzer, file_list, continue_on_error, console,
+                            workers, failed_files):
+    """
+    Analyze files across a pool of worker processes.
+
+    When the analyzer's cache is enabled, duplicate content is detected
+    here in the parent: each unique file is analyzed once and its results
+    are copied to the duplicates (worker processes have separate caches).
+
+    Args:
+        analyzer: AudioAnalyzer whose settings the workers copy
+        file_list: List of file paths
+        continue_on_error: Whether to continue if a file fails
+        console: Rich console for output
+        workers: Maximum number of worker processes
+        failed_files: List that (file_path, error) pairs are appended to
+
+    Returns:
+        List of analysis results, in the same order as file_list
+    """
+    results_by_index = {}
+    cache_keys = [
+        analyzer._cache_key(file_path) if analyzer.use_cache else None
+        for file_path in file_list
+    ]
+
+    # Resolve cache hits and duplicates up front; only the first file with
+    # each content is analyzed
+    first_with_key = {}
+    duplicates = {}
+    to_analyze = []
+    for i, cache_key in enumerate(cache_keys):
+        cached = analyzer._cached_results(cache_key, file_list[i])
+        if cached is not None:
+            results_by_index[i] = cached
+        elif cache_key is not None and cache_key in first_with_key:
+            duplicates.setdefault(first_with_key[cache_key], []).append(i)
+        else:
+            if cache_key is not None:
+                first_with_key[cache_key] = i
+            to_analyze.append(i)
+
+    for done, i in enumerate(sorted(results_by_index), 1):
+        results = results_by_index[i]
+        console.print(f"\n[{done}/{len(file_list)}] Cached: {Path(file_list[i]).name}")
+        console.print(f"  BPM: {results['bpm']:.1f} | Key: {results['key_string']}")
+    done = len(results_by_index)
+
+    if not to_analyze:
+        return [results_by_index[i] for i in sorted(results_by_index)]
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(to_analyze)),
+        initializer=_init_worker,
+        initargs=(
+            analyzer.verbose,
+            analyzer.audio_processor.max_analysis_seconds,
+            # Duplicates never reach the workers, so they don't need a cache
+            False
+        )
+    ) as executor:
+        # Submit the largest files first so a long file queued last
+        # doesn't leave the other workers idle at the end of the batch
+        submission_order = sorted(
+            to_analyze,
+            key=lambda i: _file_size(file_list[i]),
+            reverse=True
+        )
+        futures = {
+            executor.submit(_analyze_in_worker, file_list[i]): i
+            for i in submission_order
+        }
+
+        for future in as_completed(futures):
+            i = futures[future]
+            same_content = [i] + duplicates.get(i, [])
+
+            try:
+                results = future.result()
+            except Exception as e:
+                for j in same_content:
+                    done += 1
+                    failed_files.append((file_list[j], str(e)))
+                    console.print(f"\n[{done}/{len(file_list)}] Failed: {Path(file_list[j]).name}")
+                    console.print(f"  [red]✗ {e}[/red]")
+
+                if not continue_on_error:
+                    for pending in futures:
+                        pending.cancel()
+                    console.print(f"\n[bold red]Batch processing stopped.[/bold red]")
+                    console.print(f"Use --continue-on-error to skip failed files.\n")
+                    raise
+                continue
+
+            results_by_index[i] = results
+            analyzer._store_results(cache_keys[i], results)
+
+            for j in same_content:
+                done += 1
+                if j == i:
+                    console.print(f"\n[{done}/{len(file_list)}] Analyzed: {Path(file_list[j]).name}")
+                else:
+                    results_by_index[j] = analyzer._copy_results(results, file_list[j])
+                    console.print(f"\n[{done}/{len(file_list)}] Cached: {Path(file_list[j]).name}")
+
+                # Show quick summary
+                console.print(f"  BPM: {results['bpm']:.1f} | Key: {results['key_string']}")
+
+    return [results_by_index[i] for i in sorted(results_by_index)]
+
+
 def display_batch_summary(results_list, console):
     """
     Display summary table for batch analysis results.
@@ -322,8 +639,6 @@ def display_batch_summary(results_list, console):
         results_list: List of analysis result dictionaries
         console: Rich console for output
     """
-    from rich.table import Table
-
     console.print()
 
     # Create results table
@@ -347,46 +662,106 @@ def display_batch_summary(results_list, console):
     console.print()
 
 
+# Buffer size for result files, so large batches are written in few syscalls
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Above this many results, JSON export is encoded one record at a time
+STREAMING_JSON_THRESHOLD = 1000
+
+# Columns written by CSV export, in order
+CSV_FIELDNAMES = ('file', 'bpm', 'bpm_confidence', 'bpm_confidence_level',
+                  'key', 'mode', 'key_string', 'key_confidence',
+                  'key_confidence_level', 'duration', 'analysis_time')
+
+
+def _json_dumps(data):
+    """
+    Serialize analysis results as indented JSON text.
+
+    Uses orjson when it is installed, falling back to the standard library.
+
+    Args:
+        data: Result dictionary or list of result dictionaries
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+        ).decode('utf-8')
+    return json.dumps(data, indent=2, cls=NumpyEncoder)
+
+
 def save_results(results_list, output_file, console):
     """
-    Save analysis results to file (CSV or JSON).
+    Save analysis results to file (CSV, JSON Lines or JSON).
 
     Args:
         results_list: List of analysis result dictionaries
         output_file: Output file path
         console: Rich console for output
     """
-    import csv
-    import json
-
     output_path = Path(output_file)
 
     try:
         if output_path.suffix.lower() == '.csv':
             # Save as CSV
-            with open(output_path, 'w', newline='') as csvfile:
+            with open(output_path, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as csvfile:
                 if not results_list:
                     console.print("[yellow]No results to save[/yellow]")
                     return
 
-                # Determine CSV headers from first result
-                fieldnames = ['file', 'bpm', 'bpm_confidence', 'bpm_confidence_level',
-                             'key', 'mode', 'key_string', 'key_confidence',
-                             'key_confidence_level', 'duration', 'analysis_time']
-
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-                writer.writeheader()
+                # Project each result onto the CSV columns up front so
+                # writerows only sees plain lists
+                rows = [[result.get(field, '') for field in CSV_FIELDNAMES]
+                        for result in results_list]
 
-                for result in results_list:
-                    writer.writerow(result)
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_FIELDNAMES)
+                writer.writerows(rows)
 
             console.print(f"\n[green]✓ Results saved to:[/green] {output_path}")
             console.print(f"  Format: CSV | Records: {len(results_list)}\n")
 
+        elif output_path.suffix.lower() == '.jsonl':
+            # Save as JSON Lines, one result object per line
+            if orjson is not None:
+                option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+                with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as jsonlfile:
+                    jsonlfile.writelines(orjson.dumps(result, option=option)
+                                         for result in results_list)
+            else:
+                with open(output_path, 'w', buffering=WRITE_BUFFER_SIZE) as jsonlfile:
+                    jsonlfile.writelines(json.dumps(result, cls=NumpyEncoder) + '\n'
+                                         for result in results_list)
+
+            console.print(f"\n[green]✓ Results saved to:[/green] {output_path}")
+            console.print(f"  Format: JSON Lines | Records: {len(results_list)}\n")
+
         else:
             # Save as JSON (default)
-            with open(output_path, 'w') as jsonfile:
-                json.dump(results_list, jsonfile, indent=2, cls=NumpyEncoder)
+            if orjson is not None and len(results_list) > STREAMING_JSON_THRESHOLD:
+                # Stream records so memory stays bounded by a single record
+                with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as jsonfile:
+                    jsonfile.write(b'[\n')
+                    for i, result in enumerate(results_list):
+                        if i:
+                            jsonfile.write(b',\n')
+                        jsonfile.write(orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY))
+                    jsonfile.write(b'\n]\n')
+            elif orjson is not None:
+                with open(output_path, 'wb') as jsonfile:
+                    jsonfile.write(orjson.dumps(
+                        results_list,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+                    ))
+            else:
+                # json.dump already encodes incrementally and emits many
+                # small writes; buffer them
+                with open(output_path, 'w', buffering=WRITE_BUFFER_SIZE) as jsonfile:
+                    json.dump(results_list, jsonfile, indent=2, cls=NumpyEncoder)
 
             console.print(f"\n[green]✓ Results saved to:[/green] {output_path}")
             console.print(f"  Format: JSON | Records: {len(results_list)}\n")
@@ -412,6 +787,9 @@ Examples:
     %(prog)s --batch *.mp3
     %(prog)s --dir /path/to/music/folder
 
+  Parallel batch processing:
+    %(prog)s --dir music/ --workers 4
+
   Export results:
     %(prog)s --batch *.mp3 --output results.csv
     %(prog)s --dir music/ --output analysis.json
@@ -471,18 +849,47 @@ Examples:
         '--output',
         type=str,
         metavar='FILE',
-        help='Save results to file (CSV or JSON based on extension)'
+        help='Save results to file (CSV, JSON Lines or JSON based on extension)'
     )
     parser.add_argument(
         '--continue-on-error',
         action='store_true',
         help='Continue batch processing even if some files fail'
     )
+    parser.add_argument(
+        '--full-analysis',
+        action='store_true',
+        help='Analyze entire files instead of the middle '
+             f'{AudioProcessor.DEFAULT_MAX_ANALYSIS_SECONDS:.0f} seconds'
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reuse results for duplicate files (matched by content)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar='N',
+        help='Number of parallel processes for batch analysis (default: CPU count)'
+    )
 
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
     # Create analyzer
-    analyzer = AudioAnalyzer(verbose=args.verbose)
+    if args.full_analysis:
+        max_analysis_seconds = None
+    else:
+        max_analysis_seconds = AudioProcessor.DEFAULT_MAX_ANALYSIS_SECONDS
+    analyzer = AudioAnalyzer(
+        verbose=args.verbose,
+        max_analysis_seconds=max_analysis_seconds,
+        use_cache=args.cache
+    )
     console = Console()
 
     try:
@@ -491,21 +898,26 @@ Examples:
             results = analyzer.analyze_file(args.file)
             results_list = [results]
         elif args.batch:
-            results_list = analyze_batch(analyzer, args.batch, args.continue_on_error, console)
+            results_list = analyze_batch(analyzer, args.batch, args.continue_on_error, console,
+                                         workers=args.workers)
         elif args.dir:
-            import glob
-            import os
-            # Find all audio files in directory
-            audio_files = []
-            for ext in ['.wav', '.mp3', '.flac', '.aiff', '.aif', '.ogg', '.m4a']:
-                audio_files.extend(glob.glob(os.path.join(args.dir, f'*{ext}')))
-                audio_files.extend(glob.glob(os.path.join(args.dir, f'*{ext.upper()}')))
+            # Find all audio files in directory with a single listing,
+            # skipping hidden files as the shell-style '*' pattern did
+            audio_exts = AudioProcessor.SUPPORTED_FORMATS
+            with os.scandir(args.dir) as entries:
+                audio_files = sorted(
+                    entry.path for entry in entries
+                    if not entry.name.startswith('.')
+                    and entry.is_file()
+                    and os.path.splitext(entry.name)[1].lower() in audio_exts
+                )
 
             if not audio_files:
                 console.print(f"\n[bold red]No audio files found in:[/bold red] {args.dir}\n", style="red")
                 return 1
 
-            results_list = analyze_batch(analyzer, audio_files, args.continue_on_error, console)
+            results_list = analyze_batch(analyzer, audio_files, args.continue_on_error, console,
+                                         workers=args.workers)
         else:  # microphone
             results = analyzer.analyze_microphone(args.duration)
             results_list = [results]
@@ -515,9 +927,9 @@ Examples:
             save_results(results_list, args.output, console)
         elif args.json:
             if len(results_list) == 1:
-                print(json.dumps(results_list[0], indent=2, cls=NumpyEncoder))
+                print(_json_dumps(results_list[0]))
             else:
-                print(json.dumps(results_list, indent=2, cls=NumpyEncoder))
+                print(_json_dumps(results_list))
         else:
             # Display results
             if len(results_list) == 1:
@@ -5,12 +5,58 @@ Analyzes onset strength envelope to determine tempo.
 
 import numpy as np
 import librosa
-from typing import Optional, Tuple
+import scipy.fft
+import scipy.signal
+from numba import njit
+from typing import Tuple, Union
+
+
+@njit(cache=True, fastmath=True)
+def _bpm_confidence_kernel(autocorr, frames_per_beat):
+    """
+    Ratio of the autocorrelation at the beat period to its peak.
+
+    Fuses the max-scan over non-zero lags, the lookup at the beat lag and
+    the clamping into a single loop.
+
+    Args:
+        autocorr: Autocorrelation of the onset envelope (float64)
+        frames_per_beat: Beat period in onset frames
+
+    Returns:
+        Confidence score between 0 and 1 (0.5 if undetermined)
+    """
+    n = autocorr.shape[0]
+    idx = int(frames_per_beat)
+    if idx >= n:
+        return 0.5
+
+    max_value = 0.0
+    for i in range(1, n):
+        value = autocorr[i]
+        if value > max_value:
+            max_value = value
+
+    if max_value <= 0.0:
+        return 0.5
+
+    confidence = abs(autocorr[idx] / max_value)
+    if confidence > 1.0:
+        confidence = 1.0
+    return confidence
 
 
 class BPMDetector:
     """Detects BPM (tempo) from audio data."""
 
+    # Tempo only depends on low-frequency envelope energy, so the onset
+    # envelope is computed at half the input rate. The STFT sizes are
+    # halved too, keeping the same time resolution per frame.
+    DECIMATION = 2
+    N_FFT = 1024
+    HOP_LENGTH = 256
+    N_MELS = 128
+
     def __init__(self, sample_rate: int = 22050):
         """
         Initialize the BPM detector.
@@ -19,6 +65,23 @@ class BPMDetector:
             sample_rate: Sample rate of the audio data
         """
         self.sample_rate = sample_rate
+        self._analysis_rate = sample_rate // self.DECIMATION
+
+        # Anti-aliasing filter, same design scipy.signal.decimate uses for ftype='fir'
+        self._decimation_taps = scipy.signal.firwin(
+            20 * self.DECIMATION + 1, 1.0 / self.DECIMATION, window='hamming'
+        )
+
+        # STFT window and mel filter bank are identical for every call
+        self._window = scipy.signal.windows.hann(self.N_FFT, sym=False).astype(np.float32)
+        self._mel_basis = librosa.filters.mel(
+            sr=self._analysis_rate,
+            n_fft=self.N_FFT,
+            n_mels=self.N_MELS
+        )
+
+        # Compile (or load from cache) the confidence kernel up front
+        _bpm_confidence_kernel(np.zeros(2), 1.0)
 
     def detect(self, audio_data: np.ndarray) -> Tuple[float, float]:
         """
@@ -43,16 +106,14 @@ class BPMDetector:
 
         try:
             # Calculate onset strength envelope
-            onset_env = librosa.onset.onset_strength(
-                y=audio_data,
-                sr=self.sample_rate
-            )
+            onset_env = self._onset_envelope(audio_data)
 
             # Estimate tempo using onset strength
             # Returns array of tempo estimates, we take the first (primary) tempo
             tempo = librosa.feature.tempo(
                 onset_envelope=onset_env,
-                sr=self.sample_rate
+                sr=self._analysis_rate,
+                hop_length=self.HOP_LENGTH
             )
 
             # Extract the primary tempo value
@@ -66,41 +127,68 @@ class BPMDetector:
         except Exception as e:
             raise RuntimeError(f"Error detecting BPM: {str(e)}") from e
 
+    def _onset_envelope(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Calculate the onset strength envelope at the reduced analysis rate.
+
+        Equivalent to librosa.onset.onset_strength(y=audio_data) on the
+        decimated signal, but reuses the precomputed window and mel filter bank.
+
+        Args:
+            audio_data: Audio data as numpy array
+
+        Returns:
+            Onset strength envelope
+        """
+        # Zero-phase FIR decimation, as scipy.signal.decimate(ftype='fir') does
+        audio_bpm = scipy.signal.resample_poly(
+            audio_data, 1, self.DECIMATION, window=self._decimation_taps
+        ).astype(np.float32, copy=False)
+
+        stft = librosa.stft(
+            audio_bpm,
+            n_fft=self.N_FFT,
+            hop_length=self.HOP_LENGTH,
+            window=self._window
+        )
+        mel = self._mel_basis @ (np.abs(stft) ** 2)
+
+        return librosa.onset.onset_strength(
+            S=librosa.power_to_db(mel),
+            sr=self._analysis_rate,
+            hop_length=self.HOP_LENGTH
+        )
+
     def _calculate_confidence(self, onset_env: np.ndarray, bpm: float) -> float:
         """
         Calculate confidence score for the detected BPM.
 
         Args:
-            onset_env: Onset strength envelope
+            onset_env: Onset strength envelope from _onset_envelope
             bpm: Detected BPM
 
         Returns:
             Confidence score between 0 and 1
         """
         try:
-            # Use autocorrelation to measure periodicity
-            autocorr = librosa.autocorrelate(onset_env)
+            # Use autocorrelation to measure periodicity, computed as the
+            # inverse FFT of the power spectrum (zero-padded to avoid wrap-around)
+            n = len(onset_env)
+            n_fft = scipy.fft.next_fast_len(2 * n - 1, real=True)
+            fft = librosa.get_fftlib()
+            spectrum = fft.rfft(onset_env, n=n_fft)
+            autocorr = fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft)[:n]
 
             # Find the peak corresponding to the detected BPM
             # Convert BPM to frames
-            hop_length = 512
-            frames_per_beat = 60 * self.sample_rate / (bpm * hop_length)
-
-            # Get autocorrelation value at the detected period
-            if frames_per_beat < len(autocorr):
-                idx = int(frames_per_beat)
-                peak_value = autocorr[idx]
-                max_value = np.max(autocorr[1:])  # Exclude zero lag
+            frames_per_beat = 60 * self._analysis_rate / (bpm * self.HOP_LENGTH)
 
-                if max_value > 0:
-                    confidence = min(abs(peak_value / max_value), 1.0)
-                else:
-                    confidence = 0.5
-            else:
-                confidence = 0.5
-
-            # Normalize confidence to be between 0 and 1
-            confidence = max(0.0, min(1.0, confidence))
+            # Compare autocorrelation at the detected period with the peak
+            # over all non-zero lags
+            confidence = _bpm_confidence_kernel(
+                autocorr.astype(np.float64, copy=False),
+                frames_per_beat
+            )
 
             return confidence
 
@@ -119,26 +207,34 @@ class BPMDetector:
 
         Returns:
             Tuple of (primary_bpm, confidence, alternative_bpms)
+
+        Raises:
+            ValueError: If audio data is invalid or n_estimates is less than 1
         """
         if audio_data is None or len(audio_data) == 0:
             raise ValueError("Audio data is empty")
 
+        if n_estimates < 1:
+            raise ValueError("n_estimates must be at least 1")
+
         try:
             # Calculate onset strength envelope
-            onset_env = librosa.onset.onset_strength(
-                y=audio_data,
-                sr=self.sample_rate
-            )
+            onset_env = self._onset_envelope(audio_data)
 
             # Get multiple tempo estimates
             tempos = librosa.feature.tempo(
                 onset_envelope=onset_env,
-                sr=self.sample_rate,
+                sr=self._analysis_rate,
+                hop_length=self.HOP_LENGTH,
                 aggregate=None  # Get all estimates
             )
 
-            # Convert to list and sort by likelihood
-            tempo_list = sorted(tempos.flatten(), reverse=True)[:n_estimates]
+            # Select the top estimates without sorting every frame
+            flat = tempos.ravel()
+            k = min(n_estimates, flat.size)
+            top = flat[np.argpartition(flat, -k)[-k:]]
+            top.sort()
+            tempo_list = top[::-1].tolist()
 
             # Primary tempo is the first one
             primary_bpm = float(tempo_list[0])
@@ -171,15 +267,20 @@ class BPMDetector:
         else:
             return "Low"
 
-    def validate_bpm(self, bpm: float) -> bool:
+    def validate_bpm(self, bpm: Union[float, np.ndarray]) -> Union[bool, np.ndarray]:
         """
-        Validate that a BPM value is reasonable.
+        Validate that a BPM value, or an array of BPM values, is reasonable.
 
         Args:
-            bpm: BPM value to validate
+            bpm: BPM value or array of BPM values to validate
 
         Returns:
-            True if valid, False otherwise
+            True if valid, False otherwise; for arrays, a boolean array
+            with one entry per value
         """
         # Typical music BPM range is 40-240
-        return 40.0 <= bpm <= 240.0
+        if np.ndim(bpm) == 0:
+            return 40.0 <= bpm <= 240.0
+
+        bpm = np.asarray(bpm)
+        return (bpm >= 40.0) & (bpm <= 240.0)